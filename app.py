@@ -1,31 +1,76 @@
-import base64
 import datetime
 import email
 import email.header
 import os
 import re
-import eml_parser
-from flask import Flask, request, jsonify
+import shutil
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Request, request, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 from extract_text_wordpdf import (
     extract_doc,
     process_pdf_upload,
-    extract_text_from_txt,
     extract_text_from_csv,
-    extract_text_from_xlsx,
-    extract_text_from_html, process_image_jpg
+    extract_text_from_html
 )
 from extract_emailbody import read_email
 from extractmsg import extract_text_from_msg
-from extract_msg_body import read_email_content
 from extract_text_from_doc import extract_text_from_doc
-from bs4 import BeautifulSoup
-import requests
+from attachment_pool import extract_attachments, get_thread_pool
+from link_fetcher import get_link_fetcher, unique_urls
+from link_cache import get_link_cache
+from html_engine import parse_html
+from workspace import SpooledFile, Workspace
+from email_message import ParsedEmail
+from nested_messages import NestingBudget, spool_attachments
+from extraction_cache import get_extraction_cache
+from extractor_registry import detect_mime, filetype_label, EML, MSG, PDF, DOC
+from metrics import (
+    PROMETHEUS_CONTENT_TYPE, collecting_timings, render_counters, render_gauge, render_metrics, span, submit,
+    timing_breakdown
+)
+from text_normalizer import normalize_result, normalize_text
+from job_queue import get_job_queue
+from warmup import warm_up, warm_up_on_start
+
+# Every limit, pool size and cache location in this service is an environment variable, read once at import
+# in a block at the top of the module that uses it
+
+# Upload limits; requests above them are rejected while still streaming in
+max_upload_bytes = int(os.getenv('MAX_UPLOAD_BYTES', 512 * 1024 * 1024))
+max_upload_file_bytes = int(os.getenv('MAX_UPLOAD_FILE_BYTES', max_upload_bytes))
+
+# File types accepted by /upload, /upload/batch and /jobs, detected from the content
+UPLOAD_TYPES = {EML, MSG, PDF, DOC}
+
+# Batch limits; items of one batch run in parallel on their own threads
+batch_max_items = int(os.getenv('BATCH_MAX_ITEMS', 500))
+batch_workers = int(os.getenv('BATCH_WORKERS', 4))
+
+class SpoolingRequest(Request):
+    """Request that streams uploaded files into the request workspace, hashing them as they arrive."""
+    workspace = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.workspace is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return self.workspace.spool(filename or 'upload', max_size=max_upload_file_bytes)
+
+class BatchTooLarge(RequestEntityTooLarge):
+    """Raised when a batch or archive holds more files than batch_max_items."""
 
 app = Flask(__name__)
+app.request_class = SpoolingRequest
+app.config['MAX_CONTENT_LENGTH'] = max_upload_bytes
 CORS(app)
 app.config['CORS_HEADERS'] = 'Content-Type'
 
+if warm_up_on_start:
+    warm_up()
+
 def json_serial(obj):
     """JSON serializer for objects not serializable by default json code"""
     if isinstance(obj, datetime.datetime):
@@ -38,149 +83,108 @@ def json_serial(obj):
 
 def extract_links_from_html(body):
     """Extracts hyperlinks from anchor elements in the email body."""
-    soup = BeautifulSoup(body, 'html.parser')
-    links = []
-
-    # Find all anchor tags that contain a hyperlink
-    for button in soup.find_all('a', href=True):
-        links.append(clean_url(button['href']))
-
-    return links
+    # Anchor hrefs are cleaned with clean_url as the document is parsed
+    return parse_html(body).links
 
 def extract_links_from_text(body):
     """Extracts all valid URLs from plain text using regular expressions."""
     url_pattern = re.compile(r'https?://[^\s]+')
     return url_pattern.findall(body)
 
-def clean_url(url):
-    """Cleans a URL by removing trailing unwanted characters such as > or ] if they exist."""
-    return url.rstrip('>').rstrip(']')
-
 def clean_filetype(filetype):
     """Cleans the file type by removing any unwanted characters such as '>' or '<'."""
     return filetype.split('?')[0].split('#')[0].strip('.').lower()  # Clean and extract file extension
 
-def process_external_link(url):
-    """Fetches the URL content and extracts text based on document type."""
-    # Send GET request to the URL
-    response = requests.get(url)
-    content_type = response.headers.get('Content-Type')
+def extract_link_content(link):
+    """Extracts text from a downloaded hyperlink based on its sniffed document type."""
+    if not link.ok:
+        return 'Unsupported document format'
 
-    # Based on the content type, handle different document formats
-    if 'pdf' in content_type:
-        pdf_text = process_pdf_upload(response.content)  # Process PDF content
+    # Based on the sniffed type, handle different document formats
+    if link.kind == 'pdf':
+        pdf_text = process_pdf_upload(link.content)  # Process PDF content, normalized by the extractor
         return pdf_text
-    elif 'html' in content_type:
-        html_text = extract_text_from_html(response.content)  # Process HTML content
-        return html_text
-    elif 'doc' in content_type or 'docx' in content_type:
-        docx_text = extract_doc(response.content)  # Process DOCX content
-        return docx_text
-    elif 'csv' in content_type:
-        csv_text = extract_text_from_csv(response.content)  # Process CSV content
-        return csv_text
-    elif 'txt' in content_type:
-        return response.text  # Text content directly
+    elif link.kind == 'html':
+        html_text = extract_text_from_html(link.content)  # Process HTML content
+        return normalize_text(html_text)
+    elif link.kind in ('doc', 'docx'):
+        docx_text = extract_doc(link.content)  # Process DOCX content
+        return normalize_text(docx_text)
+    elif link.kind == 'csv':
+        csv_text = extract_text_from_csv(link.content)  # Process CSV content
+        return normalize_text(csv_text)
+    elif link.kind == 'txt':
+        return normalize_text(link.text())  # Text content directly
     else:
         return 'Unsupported document format'
-    
-def parse_email(eml_file_name, output_folder_path='email_attachments'):
-    def clear_output_folder(path):
-        """Clears the output folder to remove previous attachments"""
-        if os.path.exists(path) and os.path.isdir(path):
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    os.remove(os.path.join(root, file))
-                for dir in dirs:
-                    os.rmdir(os.path.join(root, dir))
-        os.makedirs(path, exist_ok=True)
-
-    def recursively_extract_attachments(eml_file_name, output_folder_path):
-        ep = eml_parser.EmlParser(include_attachment_data=True)
-        print(f'Parsing: {eml_file_name}')
-        with open(eml_file_name, 'rb') as f:
-            m = ep.decode_email_bytes(f.read())
-        attachments = []
-
-        if 'attachment' in m:
-            for a in m['attachment']:
-                out_filepath = os.path.join(output_folder_path, a['filename'])
-                print(f'\tWriting attachment: {out_filepath}')
-                with open(out_filepath, 'wb') as a_out:
-                    a_out.write(base64.b64decode(a['raw']))
-                attachments.append({'filename': a['filename'], 'path': out_filepath})
-            print('Regular attachments extracted')
-
-        return attachments
-
-    clear_output_folder(output_folder_path)
-
-    attachments = recursively_extract_attachments(eml_file_name, output_folder_path)
-
-    parsed_attachments = []
-    for attachment in attachments:
-        file_path = attachment['path']
-        file_name = attachment['filename']
-        filetype = os.path.splitext(file_name)[1][1:].lower()
-
-        try:
-            if file_name.endswith('.docx'):
-                print(f"Extracting text from docx file: {file_name}")
-                docx_text = extract_doc(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': docx_text if docx_text else 'Invalid attachment'})
-            
-            elif file_name.endswith('.doc'):
-                print(f"Extracting text from doc file: {file_name}")
-                doc_text = extract_text_from_doc(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': doc_text if doc_text else 'Invalid attachment'})
-            
-            elif file_name.endswith('.pdf'):
-                print(f"Extracting text from pdf file: {file_name}")
-                with open(file_path, 'rb') as pdf_file:
-                    pdf_data = pdf_file.read()
-                pdf_text = process_pdf_upload(pdf_data)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': pdf_text if pdf_text else 'Invalid attachment'})
-
-            elif file_name.endswith('.txt'):
-                print(f"Extracting text from txt file: {file_name}")
-                txt_text = extract_text_from_txt(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': txt_text if txt_text else 'Invalid attachment'})
-
-            elif file_name.endswith('.csv'):
-                print(f"Extracting text from csv file: {file_name}")
-                csv_text = extract_text_from_csv(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': csv_text if csv_text else 'Invalid attachment'})
-
-            elif file_name.endswith('.xlsx'):
-                print(f"Extracting text from xlsx file: {file_name}")
-                xlsx_text = extract_text_from_xlsx(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': xlsx_text if xlsx_text else 'Invalid attachment'})
-
-            elif file_name.endswith('.html'):
-                print(f"Extracting text from html file: {file_name}")
-                html_text = extract_text_from_html(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': html_text if html_text else 'Invalid attachment'})
-
-            elif file_name.endswith('.jpg') or file_name.endswith('.jpeg') or file_name.endswith('.png'):
-                print(f"Extracting text from image file: {file_name}")
-                image_text = process_image_jpg(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': image_text if image_text else 'Poor quality image or invalid attachment'})
-
-            elif file_name.startswith('part-000'):
-                print(f"Extracting text from MSG file: {file_name}")
-                msg_text = read_email_content(file_path)
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': msg_text if msg_text else 'Invalid attachment'})
 
-            else:
-                print(f"Unsupported file format: {file_name}")
-                parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': 'Invalid attachment'})
+def extract_cached_link_content(link, cached_link=None):
+    """Extracts a fetched link, reusing its cached text when the server confirms it has not changed."""
+    link_cache = get_link_cache()
+    if cached_link is not None:
+        if link.not_modified:
+            link_cache.refresh(cached_link, link)
+            return cached_link.content
+        # A stale copy beats no copy when the server cannot be reached, unless it forbids that
+        if link.error is not None and not cached_link.must_revalidate:
+            link_cache.count('stale_served')
+            return cached_link.content
+    with span('link_extract', link.kind or 'other'):
+        link_content = extract_link_content(link)
+    link_cache.put(link, link_content)
+    return link_content
 
+def process_external_link(url):
+    """Fetches the URL content and extracts text based on document type."""
+    return process_external_links([url])[0][1]
+
+def process_external_links(urls):
+    """Fetches all distinct URLs concurrently and extracts their text, keeping the link order.
+
+    Links still fresh in the link cache are not requested at all; stale ones are revalidated with a
+    conditional request and only downloaded and extracted again when they changed.
+    """
+    link_cache = get_link_cache()
+    cached_links = {url: link_cache.get(url) for url in unique_urls(urls)}
+    stale_urls = [url for url, cached_link in cached_links.items() if cached_link is None or not cached_link.is_fresh()]
+    validators = {url: cached_links[url].validators() for url in stale_urls if cached_links[url] is not None}
+    fetched_links = get_link_fetcher().fetch_many(stale_urls, validators)
+    futures = {link.url: submit(get_thread_pool(), extract_cached_link_content, link, cached_links[link.url])
+               for link in fetched_links}
+
+    results = []
+    for url, cached_link in cached_links.items():
+        if url not in futures:
+            print(f"Link cache hit for {url}")
+            results.append((url, cached_link.content))
+            continue
+        try:
+            link_content = futures[url].result()
         except Exception as e:
-            print(f"Error parsing {file_name}: {e}")
-            parsed_attachments.append({'filename': file_name, 'filetype': filetype, 'content': 'Invalid attachment'})
-
-    # Extract the email body
-    email_details = read_email(eml_file_name)
+            print(f"Error processing link {url}: {e}")
+            link_content = None
+        results.append((url, link_content))
+    return results
+
+def parse_email(eml_file, workspace=None):
+    """Parses an EML file given as a path, bytes or ParsedEmail, keeping attachments in a private workspace."""
+    if workspace is None:
+        with Workspace() as workspace:
+            return parse_email(eml_file, workspace)
+
+    # The message is parsed once and shared by the attachment and body extractors
+    with span('mime_parse'):
+        parsed_email = ParsedEmail.load(eml_file)
+    attachments = spool_attachments(parsed_email, workspace)
+
+    # Forwarded messages are extracted recursively, within one depth, size and dedupe budget per upload
+    parsed_attachments = extract_attachments(attachments, NestingBudget())
+
+    # Extract the email body; text is normalized as it is extracted, not over the whole result afterwards
+    with span('email_body'):
+        email_details = read_email(parsed_email)
+    with span('normalize'):
+        email_details = normalize_result(email_details)
 
     if 'Body' not in email_details or not email_details['Body'].strip():
         email_details['Body'] = 'Unavailable'
@@ -190,11 +194,9 @@ def parse_email(eml_file_name, output_folder_path='email_attachments'):
     extracted_links_content = []
     hyperlink_counter = 1  # Initialize counter for hyperlink filenames
 
-    # For each link found, fetch content and store it
-    for link in links:
-        print(f"Processing link: {link}")
-        link_content = process_external_link(link)
-        
+    # Fetch every link concurrently and store the content in link order
+    print(f"Processing links: {links}")
+    for link, link_content in process_external_links(links):
         if link_content and link_content != "Unsupported document format":
             # Extract the file type from the link
             filetype = link.split('.')[-1].lower()  # Default filetype extraction using extension
@@ -223,24 +225,86 @@ def parse_email(eml_file_name, output_folder_path='email_attachments'):
 
     return email_details
 
-def clean_text(text):
-    """Removes excessive newlines and formats the text properly."""
-    if isinstance(text, dict):
-        return {key: clean_text(value) for key, value in text.items()}
-    elif isinstance(text, list):
-        return [clean_text(item) for item in text]
-    elif isinstance(text, str):
-        text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    return text
-
+def spool_upload(file, workspace):
+    """Returns the spooled upload, copying it into the workspace if the form parser did not stream it there."""
+    if isinstance(file.stream, SpooledFile):
+        return file.stream
+    upload = workspace.spool(file.filename, max_size=max_upload_file_bytes)
+    shutil.copyfileobj(file.stream, upload)
+    return upload
+
+def spool_zip_items(archive_upload, workspace):
+    """Spools every file of an uploaded zip archive, returning (name, upload or error) pairs."""
+    items = []
+    expanded_size = 0
+    with zipfile.ZipFile(archive_upload) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.filename.startswith('__MACOSX/'):
+                continue
+            if len(items) == batch_max_items:
+                raise BatchTooLarge(f"Archive has more than {batch_max_items} files")
+            # Entries are also capped while they are written, in case the declared size is wrong
+            expanded_size += info.file_size
+            if expanded_size > max_upload_bytes:
+                raise BatchTooLarge(f"Archive expands beyond {max_upload_bytes} bytes")
+            if info.file_size > max_upload_file_bytes:
+                items.append((info.filename, "File too large"))
+                continue
+            upload = workspace.spool(os.path.basename(info.filename), max_size=max_upload_file_bytes)
+            try:
+                with archive.open(info) as entry:
+                    shutil.copyfileobj(entry, upload)
+            except (zipfile.BadZipFile, RequestEntityTooLarge, RuntimeError, OSError) as e:
+                items.append((info.filename, f"Invalid archive entry: {e}"))
+                continue
+            items.append((info.filename, upload))
+    return items
+
+def process_batch_item(name, upload, workspace):
+    """Extracts one batch item, turning any failure into an error entry with the time it took."""
+    started = time.perf_counter()
+    if isinstance(upload, str):
+        item = {"error": upload}
+    else:
+        try:
+            item = process_upload(os.path.basename(name), upload, workspace)
+            if 'result' in item and not item['result']:
+                # Extractors report their own failures by returning an empty result
+                item = {"error": "Failed to process file"}
+        except Exception as e:
+            print(f"Error processing batch item {name}: {e}")
+            item = {"error": f"Failed to process file: {e}"}
+    return {"filename": name, **item, "seconds": round(time.perf_counter() - started, 3)}
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    if isinstance(e, BatchTooLarge):
+        return jsonify({"error": e.description}), 413
+    return jsonify({"error": "File too large"}), 413
 
 @app.route("/")
 def home():
     return "EML file parsing API"
 
+@app.route('/cache/stats')
+def cache_stats():
+    stats = get_extraction_cache().stats()
+    stats['links'] = get_link_cache().stats()
+    return jsonify(stats)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage timing histograms and cache counters in the Prometheus text format."""
+    extraction_stats = get_extraction_cache().stats()
+    memory_bytes = extraction_stats.pop('memory_bytes')
+    body = render_metrics((
+        render_counters('extraction_cache_events_total', 'Extraction cache lookups and stores.', 'event', extraction_stats),
+        render_gauge('extraction_cache_memory_bytes', 'Size of the in-memory extraction cache tier.', memory_bytes),
+        render_counters('link_cache_events_total', 'Hyperlink cache hits, revalidations and stores.', 'event',
+                        get_link_cache().stats()),
+    ))
+    return body, 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE}
+
 # @app.route('/upload', methods=['POST'])
 # def upload_file():
 #     if 'file' not in request.files:
@@ -290,54 +354,130 @@ def home():
 #     else:
 #         return jsonify({"error": "Unsupported file type"})
 
+def process_upload(filename, upload, workspace, mime_type=None):
+    """Extracts an uploaded file by its detected type and returns the response payload.
+
+    Every extractor normalizes its own text, so the result is returned as it is.
+    """
+    if mime_type is None:
+        mime_type = detect_mime(upload, filename)
+
+    with span('process', filetype_label(mime_type)):
+        if mime_type == EML:
+            result = parse_email(upload.source(), workspace)
+            return {"result": result}
+
+        elif mime_type == MSG:
+            with span('extract'):
+                result = extract_text_from_msg(upload.to_path())
+            return {"result": result}
+
+        elif mime_type == PDF:
+            with span('extract'):
+                result = process_pdf_upload(upload)
+            return {"result": result}
+
+        elif mime_type == DOC:
+            with span('extract'):
+                result = extract_text_from_doc(upload.source())
+            with span('normalize'):
+                return {"result": normalize_result(result)}
+
+        else:
+            return {"error": "Unsupported file type"}
+
+def wants_timings():
+    """Tells whether the client asked for a timing breakdown with ?timings=1."""
+    return request.args.get('timings', '').lower() in ('1', 'true', 'yes')
+
+def with_timings(payload):
+    """Adds the timing breakdown of the current request to a response payload, when one is being collected."""
+    breakdown = timing_breakdown()
+    if breakdown is not None:
+        payload['timings'] = breakdown
+    return payload
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    if 'file' not in request.files:
-        return jsonify({"error": "No file found"})
-    
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"error": "File not uploaded"})
-
-    if file and file.filename.endswith('.eml'):
-        eml_file_name = os.path.join('uploaded', file.filename)
-        os.makedirs('uploaded', exist_ok=True)
-        file.save(eml_file_name)
-        result = parse_email(eml_file_name)
-        cleaned_result = clean_text(result)
-        return jsonify({"result": cleaned_result})
-
-    elif file and file.filename.endswith('.msg'):
-        msg_file_name = os.path.join('uploaded', file.filename)
-        os.makedirs('uploaded', exist_ok=True)
-        file.save(msg_file_name)
-        result = extract_text_from_msg(msg_file_name)
-        cleaned_result = clean_text(result)
-        return jsonify({"result": cleaned_result})
-
-    elif file and file.filename.endswith('.pdf'):
-        pdf_file_name = os.path.join('uploaded', file.filename)
-        os.makedirs('uploaded', exist_ok=True)
-        file.save(pdf_file_name)
-
-        with open(pdf_file_name, 'rb') as pdf_file:
-            pdf_data = pdf_file.read()
-
-        result = process_pdf_upload(pdf_data)
-        cleaned_result = clean_text(result)
-        return jsonify({"result": cleaned_result})
-
-    elif file and file.filename.endswith('.doc'):
-        doc_file_name = os.path.join('uploaded', file.filename)
-        os.makedirs('uploaded', exist_ok=True)
-        file.save(doc_file_name)
-        result = extract_text_from_doc(doc_file_name)
-        cleaned_result = clean_text(result)
-        return jsonify({"result": cleaned_result})
-
-    else:
-        return jsonify({"error": "Unsupported file type"})
-
+    with collecting_timings(wants_timings()), Workspace() as workspace:
+        # Attach the workspace before the form is parsed so the upload streams straight into it
+        request.workspace = workspace
+
+        with span('upload_save') as timing:
+            if 'file' not in request.files:
+                return jsonify({"error": "No file found"})
+
+            file = request.files['file']
+            if file.filename == '':
+                return jsonify({"error": "File not uploaded"})
+
+            upload = spool_upload(file, workspace)
+            mime_type = detect_mime(upload, file.filename)
+            timing.filetype = filetype_label(mime_type)
+        return jsonify(with_timings(process_upload(file.filename, upload, workspace, mime_type)))
+
+@app.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    """Extracts many files, or the files of one zip archive, in parallel and reports each item."""
+    started = time.perf_counter()
+    with collecting_timings(wants_timings()), Workspace() as workspace:
+        request.workspace = workspace
+
+        with span('upload_save'):
+            files = [file for file in request.files.getlist('files') + request.files.getlist('file') if file.filename]
+            if not files:
+                return jsonify({"error": "No file found"})
+
+            if len(files) == 1 and files[0].filename.lower().endswith('.zip'):
+                try:
+                    items = spool_zip_items(spool_upload(files[0], workspace), workspace)
+                except zipfile.BadZipFile:
+                    return jsonify({"error": "Invalid zip archive"})
+            elif len(files) > batch_max_items:
+                raise BatchTooLarge(f"Batch has more than {batch_max_items} files")
+            else:
+                items = [(file.filename, spool_upload(file, workspace)) for file in files]
+
+        # Items share the process-wide clients, pools and extraction cache
+        with ThreadPoolExecutor(max_workers=max(1, min(batch_workers, len(items))), thread_name_prefix='batch') as pool:
+            futures = [submit(pool, process_batch_item, name, upload, workspace) for name, upload in items]
+            results = [future.result() for future in futures]
+
+        failed = sum(1 for item in results if 'error' in item)
+        summary = {
+            "items": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        return jsonify(with_timings({"results": results, "summary": summary}))
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queues an upload for the job workers and returns its id straight away."""
+    with Workspace() as workspace:
+        request.workspace = workspace
+
+        if 'file' not in request.files:
+            return jsonify({"error": "No file found"})
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({"error": "File not uploaded"})
+
+        upload = spool_upload(file, workspace)
+        if detect_mime(upload, file.filename) not in UPLOAD_TYPES:
+            return jsonify({"error": "Unsupported file type"})
+
+        job_id = get_job_queue().enqueue(file.filename, upload)
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from extractor_registry import detect_mime, filetype_label, get_extractor, get_filetype, EML
+from metrics import record, span, submit
+from text_normalizer import normalize_text
+
+# Processes take the CPU-bound extractors, at most one per core by default; threads take those that wait on I/O
+process_workers = int(os.getenv('ATTACHMENT_PROCESS_WORKERS', min(4, os.cpu_count() or 1)))
+thread_workers = int(os.getenv('ATTACHMENT_THREAD_WORKERS', 8))
+
+_pool_lock = threading.Lock()
+_process_pool = None
+_thread_pool = None
+
+
+def get_process_pool():
+    """Returns the shared process pool, creating it on first use."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            # Spawned rather than forked: a fork of this threaded process inherits any lock another thread holds
+            # at that moment, along with open sqlite connections and Azure client sessions
+            _process_pool = ProcessPoolExecutor(max_workers=process_workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+
+def get_thread_pool():
+    """Returns the shared thread pool, creating it on first use."""
+    global _thread_pool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix='attachment')
+        return _thread_pool
+
+
+def reset_process_pool(broken_pool):
+    """Drops a process pool that lost a worker so the next email gets a fresh one."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is broken_pool:
+            _process_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_process(function, *args):
+    """Runs a CPU-bound call in the shared process pool and waits for its result.
+
+    It runs inline when the pool is disabled or this already is a worker process, as doc_engine does.
+    """
+    if process_workers <= 0 or multiprocessing.parent_process() is not None:
+        return function(*args)
+    pool = get_process_pool()
+    try:
+        future = pool.submit(function, *args)
+    except BrokenProcessPool:
+        reset_process_pool(pool)
+        pool = get_process_pool()
+        future = pool.submit(function, *args)
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        reset_process_pool(pool)
+        raise
+
+
+def extract_attachment(file_name, source, mime_type=None):
+    """Extracts the content of a single attachment given as a spooled file, its bytes or a path.
+
+    The extractor is chosen by the detected content type, not by the file name.
+    """
+    filetype = get_filetype(file_name)
+    if mime_type is None:
+        mime_type = detect_mime(source, file_name)
+    extractor = get_extractor(mime_type)
+
+    if extractor is None:
+        print(f"Unsupported file format: {file_name} ({mime_type})")
+        return {'filename': normalize_text(file_name), 'filetype': filetype, 'content': 'Invalid attachment'}
+
+    print(f"Extracting text from {extractor.label} file: {file_name}")
+    # The extractor normalizes its result, inside the worker process for CPU-bound ones
+    with span('extract', filetype_label(mime_type)):
+        content = extractor(source)
+    return {'filename': normalize_text(file_name), 'filetype': filetype,
+            'content': content if content else extractor.empty_content}
+
+
+def extract_attachment_timed(file_name, source, mime_type=None):
+    """Runs extract_attachment in a worker process and returns its result with the seconds it took.
+
+    Spans recorded in a worker process stay there, so the submitting process records the extraction.
+    """
+    started = time.perf_counter()
+    return extract_attachment(file_name, source, mime_type), time.perf_counter() - started
+
+
+def attachment_mime_type(attachment):
+    """Returns the detected type of an attachment; message/rfc822 parts are known from the MIME structure."""
+    if attachment.get('message') is not None:
+        return EML
+    return detect_mime(attachment['file'], attachment['filename'])
+
+
+def submit_attachment(attachment, mime_type):
+    """Submits an attachment to the pool that suits its extractor."""
+    file_name = attachment['filename']
+    spooled_file = attachment['file']
+    extractor = get_extractor(mime_type)
+    if extractor is not None and extractor.cpu_bound and process_workers > 0:
+        # Worker processes get a picklable path, or the bytes for extractors that read from memory
+        source = spooled_file.to_path() if extractor.takes == 'path' else spooled_file.source()
+        pool = get_process_pool()
+        try:
+            return pool, pool.submit(extract_attachment_timed, file_name, source, mime_type)
+        except BrokenProcessPool:
+            reset_process_pool(pool)
+            pool = get_process_pool()
+            return pool, pool.submit(extract_attachment_timed, file_name, source, mime_type)
+
+    return None, submit(get_thread_pool(), extract_attachment, file_name, spooled_file, mime_type)
+
+
+def extract_attachments(attachments, budget=None, depth=0):
+    """Extracts all attachments concurrently and returns the results in the original order.
+
+    Embedded .eml and .msg messages are extracted recursively one level deeper, within the budget
+    shared by the whole upload.
+    """
+    # Imported here because nested messages call back into this module
+    from nested_messages import NESTED_TYPES, NestingBudget, extract_nested_messages
+    if budget is None:
+        budget = NestingBudget()
+
+    submitted = []
+    nested_messages = []
+    for attachment in attachments:
+        try:
+            mime_type = attachment_mime_type(attachment)
+            if mime_type in NESTED_TYPES:
+                nested_messages.append((attachment['filename'], attachment['file'], mime_type, attachment.get('message')))
+                submitted.append((attachment, mime_type, None))
+                continue
+            submitted.append((attachment, mime_type, submit_attachment(attachment, mime_type)))
+        except Exception as e:
+            print(f"Error scheduling {attachment['filename']}: {e}")
+            submitted.append((attachment, None, (None, None)))
+
+    # Nested messages are extracted while the regular attachments run on the shared pools
+    nested_results = iter(extract_nested_messages(nested_messages, budget, depth + 1))
+
+    parsed_attachments = []
+    for attachment, mime_type, scheduled in submitted:
+        file_name = attachment['filename']
+        if scheduled is None:
+            parsed_attachments.append(next(nested_results))
+            continue
+        pool, future = scheduled
+        try:
+            if future is None:
+                raise RuntimeError('attachment could not be scheduled')
+            if pool is None:
+                parsed_attachments.append(future.result())
+                continue
+            parsed_attachment, seconds = future.result()
+            record('extract', seconds, filetype_label(mime_type))
+            parsed_attachments.append(parsed_attachment)
+        except Exception as e:
+            # A failing extractor only invalidates its own attachment
+            if isinstance(e, BrokenProcessPool) and pool is not None:
+                reset_process_pool(pool)
+            print(f"Error parsing {file_name}: {e}")
+            parsed_attachments.append({'filename': normalize_text(file_name), 'filetype': get_filetype(file_name), 'content': 'Invalid attachment'})
+
+    return parsed_attachments
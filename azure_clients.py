@@ -0,0 +1,36 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_computervision_client():
+    """Returns the shared Computer Vision client, importing the SDK and creating it on first use."""
+    with _clients_lock:
+        if 'computervision' not in _clients:
+            from azure.cognitiveservices.vision.computervision import ComputerVisionClient
+            from msrest.authentication import CognitiveServicesCredentials
+
+            subscription_key = os.getenv('subscription_key')
+            endpoint = os.getenv('endpoint')
+            _clients['computervision'] = ComputerVisionClient(endpoint, CognitiveServicesCredentials(subscription_key))
+        return _clients['computervision']
+
+
+def get_form_recognizer_client():
+    """Returns the shared Form Recognizer client, importing the SDK and creating it on first use."""
+    with _clients_lock:
+        if 'form_recognizer' not in _clients:
+            from azure.ai.formrecognizer import DocumentAnalysisClient
+            from azure.core.credentials import AzureKeyCredential
+
+            form_recognizer_key = os.getenv('AZURE_FORM_RECOGNIZER_KEY')
+            form_recognizer_endpoint = os.getenv('AZURE_FORM_RECOGNIZER_ENDPOINT')
+            _clients['form_recognizer'] = DocumentAnalysisClient(
+                form_recognizer_endpoint, AzureKeyCredential(form_recognizer_key)
+            )
+        return _clients['form_recognizer']
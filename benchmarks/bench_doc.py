@@ -0,0 +1,86 @@
+"""Legacy .doc benchmark: the native Word 97 reader and the warm Spire.Doc pool against the previous path.
+
+Run from the repository root: python benchmarks/bench_doc.py [--files N] [--paragraphs N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_engine import read_word97_text, spire_doc_text_pooled, get_doc_pool
+
+
+def build_doc(path, paragraphs, seed):
+    """Writes a .doc file with Spire.Doc: body paragraphs and a small table."""
+    from spire.doc import Document, FileFormat
+
+    rng = random.Random(seed)
+    words = ['invoice', 'total', 'amount', 'delivery', 'customer', 'address', 'tax', 'item', 'order', 'payment']
+    document = Document()
+    section = document.AddSection()
+    for _ in range(paragraphs):
+        section.AddParagraph().AppendText(' '.join(rng.choice(words) for _ in range(rng.randint(8, 30))) + '.')
+    table = section.AddTable(True)
+    table.ResetCells(5, 4)
+    for row in range(5):
+        for column in range(4):
+            table.Rows[row].Cells[column].AddParagraph().AppendText(f'{rng.choice(words)} {rng.randint(1, 999)}')
+    document.SaveToFile(path, FileFormat.Doc)
+    document.Close()
+
+
+def previous_path(data):
+    """The previous implementation, kept as the reference: a temporary file loaded by a new Document per call."""
+    from spire.doc import Document
+
+    with tempfile.NamedTemporaryFile(suffix='.doc') as f:
+        f.write(data)
+        f.flush()
+        document = Document()
+        document.LoadFromFile(f.name)
+        document_text = document.GetText()
+        document.Close()
+    return document_text.replace("\r\nEvaluation Warning: The document was created with Spire.Doc for Python.", "")
+
+
+def throughput(extract, documents):
+    started = time.perf_counter()
+    texts = [extract(document) for document in documents]
+    return len(documents) / (time.perf_counter() - started), texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--paragraphs', type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    documents = []
+    with tempfile.TemporaryDirectory() as directory:
+        for seed in range(args.files):
+            path = os.path.join(directory, f'{seed}.doc')
+            build_doc(path, args.paragraphs, seed)
+            with open(path, 'rb') as f:
+                documents.append(f.read())
+    print(f"{args.files} documents, {args.paragraphs} paragraphs each")
+
+    # The pool is started before timing, as it would be in a running service
+    get_doc_pool().submit(len, b'').result()
+    previous_rate, previous_texts = throughput(previous_path, documents)
+    pooled_rate, _ = throughput(spire_doc_text_pooled, documents)
+    native_rate, native_texts = throughput(read_word97_text, documents)
+    for previous_text, native_text in zip(previous_texts, native_texts):
+        assert set(previous_text.split()) <= set(native_text.split()), "native text lacks words Spire found"
+    print(f"previous Spire path: {previous_rate:8.1f} documents/s")
+    print(f"warm Spire pool:     {pooled_rate:8.1f} documents/s")
+    print(f"native Word 97:      {native_rate:8.1f} documents/s  ({native_rate / previous_rate:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""DOCX benchmark: the in-process extractor against the previous per-file pandoc conversion.
+
+Run from the repository root: python benchmarks/bench_docx.py [--files N] [--paragraphs N]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+import zipfile
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx_engine import pandoc_docx_text, read_docx_text
+
+W_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+R_NAMESPACE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>
+</Types>"""
+
+PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" Target="header1.xml"/>
+</Relationships>"""
+
+
+def paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def build_docx(paragraphs, seed):
+    """Builds a report-like DOCX: a header, body paragraphs and an order table every 20 paragraphs."""
+    rng = random.Random(seed)
+    words = ['invoice', 'total', 'amount', 'delivery', 'customer', 'address', 'tax', 'item', 'order', 'payment']
+    body = []
+    for i in range(paragraphs):
+        body.append(paragraph(' '.join(rng.choice(words) for _ in range(rng.randint(8, 30))) + '.'))
+        if i % 20 == 19:
+            rows = ''.join(
+                '<w:tr>' + ''.join(f'<w:tc>{paragraph(f"{rng.choice(words)} {rng.randint(1, 999)}")}</w:tc>'
+                                   for _ in range(4)) + '</w:tr>'
+                for _ in range(5)
+            )
+            body.append(f'<w:tbl>{rows}</w:tbl>')
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{W_NAMESPACE}" '
+                f'xmlns:r="{R_NAMESPACE}"><w:body>{"".join(body)}<w:sectPr><w:headerReference w:type="default" '
+                f'r:id="rId1"/></w:sectPr></w:body></w:document>')
+    header = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:hdr xmlns:w="{W_NAMESPACE}">'
+              f'{paragraph("Quarterly order report")}</w:hdr>')
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', PACKAGE_RELS)
+        archive.writestr('word/_rels/document.xml.rels', DOCUMENT_RELS)
+        archive.writestr('word/document.xml', document)
+        archive.writestr('word/header1.xml', header)
+    return buffer.getvalue()
+
+
+def throughput(extract, documents):
+    started = time.perf_counter()
+    texts = [extract(document) for document in documents]
+    return len(documents) / (time.perf_counter() - started), texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--paragraphs', type=int, default=200)
+    args = parser.parse_args()
+
+    documents = [build_docx(args.paragraphs, seed) for seed in range(args.files)]
+    size = sum(len(document) for document in documents) / len(documents)
+    print(f"{args.files} documents, {args.paragraphs} paragraphs each, {size / 1024:.0f} KiB average")
+
+    pandoc_rate, pandoc_texts = throughput(pandoc_docx_text, documents)
+    native_rate, native_texts = throughput(read_docx_text, documents)
+    # pandoc draws table rules and leaves headers out, so only its words must all be found natively
+    for pandoc_text, native_text in zip(pandoc_texts, native_texts):
+        missing = Counter(word for word in pandoc_text.split() if word.strip('-')) - Counter(native_text.split())
+        assert not missing, f"native text lacks words pandoc found: {list(missing)[:5]}"
+    print(f"pandoc:     {pandoc_rate:8.1f} documents/s")
+    print(f"in-process: {native_rate:8.1f} documents/s  ({native_rate / pandoc_rate:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
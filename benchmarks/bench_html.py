@@ -0,0 +1,89 @@
+"""HTML benchmark: the single-pass lxml engine against the previous BeautifulSoup html.parser path.
+
+The document imitates a marketing email: nested layout tables, inline styles, tracking links and
+inline cid: images. The previous path parsed the body once for its text and once for its links.
+Run from the repository root: python benchmarks/bench_html.py [--kilobytes N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_engine import clean_url, parse_html  # noqa: E402
+from text_normalizer import normalize_text  # noqa: E402
+
+WORDS = ('offer', 'exclusive', 'members', 'save', 'today', 'free', 'shipping', 'new', 'arrivals',
+         'collection', 'limited', 'time', 'only', 'discover', 'your', 'style', 'café', 'über')
+
+
+def build_email(kilobytes, seed=7):
+    """Writes a marketing-style HTML body of roughly the given size."""
+    rng = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Weekly offers</title>',
+             '<style>td{font-family:Arial} .hero{color:#333}</style>',
+             '<script>window.dataLayer=[];if(1<2){track("open")}</script></head><body>']
+    block = 0
+    while sum(map(len, parts)) < kilobytes * 1024:
+        block += 1
+        parts.append('<table width="100%" cellpadding="0" cellspacing="0"><tr><td align="center">')
+        parts.append('<table width="600" style="border:0"><tr><td style="padding:10px" background="cid:bg%d@mail">' % block)
+        for _ in range(4):
+            words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 20)))
+            parts.append('<table><tr><td class="hero"><span style="font-size:14px">%s</span>&nbsp;</td>' % words)
+            parts.append('<td><a href="https://click.example.com/t/%d?u=%d>" style="color:#06c">Shop now</a>'
+                         % (block, rng.randint(1, 10 ** 6)))
+            parts.append('<img src="cid:image%03d.png@01DA" width="120" alt=""></td></tr></table>' % block)
+        parts.append('<!-- block %d --></td></tr></table></td></tr></table>' % block)
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def beautifulsoup_path(html):
+    # The previous implementation, kept as the reference: separate parses for the text and the links
+    from bs4 import BeautifulSoup
+    text = BeautifulSoup(html, 'html.parser').get_text(separator='\n', strip=True)
+    links = [clean_url(anchor['href']) for anchor in BeautifulSoup(html, 'html.parser').find_all('a', href=True)]
+    return text, links
+
+
+def lxml_path(html):
+    content = parse_html(html, separator='\n', strip=True)
+    return content.text, content.links
+
+
+def measure(extractor, html, repeat):
+    extractor(html)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = extractor(html)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--kilobytes', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    html = build_email(args.kilobytes)
+    print(f"{len(html.encode()) / 1024:.0f} KB marketing email body")
+    timings = {}
+    results = {}
+    for name, extractor in (('beautifulsoup', beautifulsoup_path), ('lxml', lxml_path)):
+        timings[name], results[name] = measure(extractor, html, args.repeat)
+        text, links = results[name]
+        print(f"  {name:<14} {timings[name] * 1000:8.1f} ms   {len(text)} characters, {len(links)} links")
+    print(f"  speed-up {timings['beautifulsoup'] / timings['lxml']:.1f}x")
+
+    # Both engines must agree once whitespace is normalized, as it is at extraction time
+    (reference_text, reference_links), (text, links) = results['beautifulsoup'], results['lxml']
+    assert normalize_text(reference_text) == normalize_text(text), 'visible text differs'
+    assert reference_links == links, 'links differ'
+    print(f"  same text and links; {len(parse_html(html).cid_refs)} cid: references found in the same pass")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Link cache benchmark: the same email links processed cold, after they went stale, and while fresh.
+
+A local server stands in for the linked sites, adding a fixed latency to every response. Stale links
+are revalidated with If-None-Match and answered 304, fresh ones are not requested at all.
+Run from the repository root: python benchmarks/bench_link_cache.py [--links N] [--latency MS]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Placeholders so that importing the app needs no Azure configuration
+for name in ('endpoint', 'AZURE_FORM_RECOGNIZER_ENDPOINT'):
+    os.environ.setdefault(name, 'https://azure.invalid')
+for name in ('subscription_key', 'AZURE_FORM_RECOGNIZER_KEY'):
+    os.environ.setdefault(name, 'benchmark')
+os.environ['EXTRACTION_CACHE_PATH'] = ''
+
+import app  # noqa: E402
+import link_cache  # noqa: E402
+
+
+def build_page(number):
+    """Returns a policy page of about 200 KB, the size of a typical portal document."""
+    rows = ''.join(f'<tr><td>Clause {number}.{row}</td><td>{"Terms and conditions apply. " * 12}</td></tr>'
+                   for row in range(500))
+    return f'<html><body><h1>Policy {number}</h1><table>{rows}</table></body></html>'.encode()
+
+
+def serve(pages, latency, max_age):
+    """Starts a server that answers with an ETag and the given max-age, and 304 when the tag matches."""
+    requests_seen = {'full': 0, 'not_modified': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            etag = f'"{self.path}-v1"'
+            if self.headers.get('If-None-Match') == etag:
+                requests_seen['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', f'max-age={max_age[0]}')
+                self.end_headers()
+                return
+            requests_seen['full'] += 1
+            body = pages[int(self.path.strip('/'))]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f'max-age={max_age[0]}')
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, requests_seen
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--links', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=50, help='server latency per response in milliseconds')
+    args = parser.parse_args()
+
+    pages = [build_page(number) for number in range(args.links)]
+    # The first answers are stale at once, so the second round has to revalidate
+    max_age = [0]
+    server, requests_seen = serve(pages, args.latency / 1000, max_age)
+    urls = [f'http://127.0.0.1:{server.server_port}/{number}' for number in range(args.links)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        link_cache._link_cache = link_cache.LinkCache(path=os.path.join(directory, 'links.sqlite3'))
+        print(f"{args.links} links of {len(pages[0]) / 1024:.0f} KB HTML, {args.latency:.0f} ms server latency")
+        for name in ('cold', 'revalidated', 'fresh'):
+            before = dict(requests_seen)
+            started = time.perf_counter()
+            results = app.process_external_links(urls)
+            seconds = time.perf_counter() - started
+            assert all(content.startswith(f'Policy {number}') for number, (_, content) in enumerate(results))
+            full = requests_seen['full'] - before['full']
+            not_modified = requests_seen['not_modified'] - before['not_modified']
+            print(f"  {name:<12} {seconds * 1000:8.1f} ms   {full} full downloads, {not_modified} 304 responses")
+            # From now on the server lets its answers be reused for an hour
+            max_age[0] = 3600
+        print(f"  link cache counters: {link_cache.get_link_cache().stats()}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Metrics overhead benchmark: the cost of one timing span, with and without a breakdown being collected.
+
+An upload records a few spans per attachment, so this cost is paid tens of times per request.
+Run from the repository root: python benchmarks/bench_metrics.py [--spans N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics  # noqa: E402
+
+
+def time_spans(count, filetype=None):
+    started = time.perf_counter()
+    for _ in range(count):
+        with metrics.span('benchmark', filetype):
+            pass
+    return (time.perf_counter() - started) / count
+
+
+def time_empty_loop(count):
+    started = time.perf_counter()
+    for _ in range(count):
+        pass
+    return (time.perf_counter() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--spans', type=int, default=200000)
+    args = parser.parse_args()
+
+    baseline = time_empty_loop(args.spans)
+    print(f"{args.spans} spans, per span:")
+    print(f"  histogram only            {(time_spans(args.spans) - baseline) * 1e9:7.0f} ns")
+    print(f"  with file type            {(time_spans(args.spans, 'pdf') - baseline) * 1e9:7.0f} ns")
+    with metrics.collecting_timings():
+        print(f"  collecting a breakdown    {(time_spans(args.spans) - baseline) * 1e9:7.0f} ns")
+    metrics.metrics_enabled = False
+    print(f"  METRICS_ENABLED=0         {(time_spans(args.spans) - baseline) * 1e9:7.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Micro-benchmark: the compiled text normalizer against the previous recursive clean_text.
+
+Run from the repository root: python benchmarks/bench_normalizer.py
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_normalizer import TextNormalizer, normalize_result
+
+
+def clean_text(text):
+    """The previous implementation, kept as the reference."""
+    if isinstance(text, dict):
+        return {key: clean_text(value) for key, value in text.items()}
+    elif isinstance(text, list):
+        return [clean_text(item) for item in text]
+    elif isinstance(text, str):
+        text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+        text = re.sub(r'\s+', ' ', text).strip()
+        return text
+    return text
+
+
+def spreadsheet_text(rows=100000, columns=8, seed=7):
+    """Text shaped like DataFrame.to_string output: padded columns and one line per row."""
+    rng = random.Random(seed)
+    lines = []
+    for row in range(rows):
+        cells = [f"{rng.choice(['alpha', 'beta', 'gamma', 'delta'])}-{rng.randint(0, 99999)}" for _ in range(columns)]
+        lines.append('  '.join(cell.rjust(14) for cell in cells))
+    return '\n'.join(lines)
+
+
+def pdf_result(pages=200, seed=7):
+    """A process_pdf_upload-shaped result with page text, tables and checkboxes."""
+    rng = random.Random(seed)
+    words = ['invoice', 'total', 'amount', 'date', 'customer', 'address', 'tax', 'item']
+    page_texts = ['\n'.join(' '.join(rng.choice(words) for _ in range(12)) for _ in range(60)) + '\n\n'
+                  for _ in range(pages)]
+    tables = [[[f"cell\n{r}-{c}\t" for c in range(6)] for r in range(40)] for _ in range(pages)]
+    checkboxes = [{"Page": p, "State": "selected", "Option": f"Option\r\n{p}"} for p in range(pages)]
+    return page_texts, {"text": ''.join(page_texts), "tables": tables, "checkboxes": checkboxes}
+
+
+def best_of(func, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def compare(label, reference, candidate, *args):
+    reference_time, expected = best_of(reference, *args)
+    candidate_time, result = best_of(candidate, *args)
+    assert result == expected, f"{label}: normalizer output differs from clean_text"
+    print(f"{label:<28} clean_text {reference_time * 1000:8.1f} ms   normalizer {candidate_time * 1000:8.1f} ms"
+          f"  ({reference_time / candidate_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    sheet = spreadsheet_text()
+    page_texts, result = pdf_result()
+    print(f"spreadsheet text: {len(sheet) / 1e6:.1f} MB, PDF result: {len(result['text']) / 1e6:.1f} MB of page text")
+    compare('spreadsheet text', clean_text, normalize_result, sheet)
+    compare('PDF result', clean_text, normalize_result, result)
+    # Streaming page by page never builds the joined text, which the old path had to join and then clean
+    compare('PDF pages, streamed', lambda pages: clean_text(''.join(pages)),
+            lambda pages: TextNormalizer().normalize(pages), page_texts)
@@ -0,0 +1,93 @@
+"""Spreadsheet benchmark: the streaming extractor against the previous pandas path on a large workbook.
+
+Each extractor runs in a fresh interpreter, so the peak resident memory it reports is its own.
+Run from the repository root: python benchmarks/bench_spreadsheets.py [--rows N]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = """
+import resource, sys, time
+from io import BytesIO
+
+def pandas_xlsx(path):
+    # The previous implementation, kept as the reference: first sheet only, padded to_string output
+    import pandas as pd
+    with open(path, 'rb') as f:
+        df = pd.read_excel(BytesIO(f.read()))
+    return df.to_string(index=False)
+
+def streaming_xlsx(path):
+    from spreadsheet_engine import xlsx_to_text
+    return xlsx_to_text(path)
+
+extractor = {'pandas': pandas_xlsx, 'streaming': streaming_xlsx}[sys.argv[1]]
+# Imports are paid before measuring, so only the extraction itself counts
+if sys.argv[1] == 'pandas':
+    import pandas, openpyxl
+else:
+    import spreadsheet_engine, openpyxl
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+text = extractor(sys.argv[2])
+seconds = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f'timing {seconds} {(peak - baseline) / 1024} {len(text)}')
+"""
+
+
+def build_workbook(path, rows, seed=7):
+    """Writes a workbook of mixed text, integer, float and date columns with openpyxl's streaming writer."""
+    import datetime
+    import openpyxl
+
+    rng = random.Random(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Orders')
+    sheet.append(['order', 'customer', 'region', 'quantity', 'unit price', 'total', 'shipped', 'notes'])
+    start = datetime.datetime(2024, 1, 1)
+    for row in range(rows):
+        quantity = rng.randint(1, 500)
+        price = round(rng.uniform(1, 250), 2)
+        sheet.append([
+            f'ORD-{row:07d}', f'Customer {rng.randint(1, 5000)}', rng.choice(['North', 'South', 'East', 'West']),
+            quantity, price, round(quantity * price, 2), start + datetime.timedelta(minutes=row),
+            rng.choice(['', 'expedite', 'gift wrap', 'call before delivery']),
+        ])
+    workbook.save(path)
+
+
+def run(extractor, path):
+    # Limits are lifted so both extractors read every row
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, SPREADSHEET_MAX_ROWS='100000000',
+               SPREADSHEET_MAX_CELLS='1000000000', SPREADSHEET_MAX_CHARS='10000000000')
+    result = subprocess.run(
+        [sys.executable, '-c', MEASURE, extractor, path], capture_output=True, text=True, env=env, cwd=REPO_ROOT, check=True
+    )
+    line = next(line for line in result.stdout.splitlines() if line.startswith('timing '))
+    seconds, peak_mb, length = line.split()[1:]
+    return float(seconds), float(peak_mb), int(length)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'orders.xlsx')
+        build_workbook(path, args.rows)
+        print(f"{args.rows} rows x 8 columns, {os.path.getsize(path) / 1e6:.1f} MB workbook")
+        for extractor in ('pandas', 'streaming'):
+            seconds, peak_mb, length = run(extractor, path)
+            print(f"  {extractor:<10} {seconds:7.2f} s   peak +{peak_mb:7.1f} MB   {length / 1e6:6.1f} M characters of text")
+
+
+if __name__ == '__main__':
+    main()
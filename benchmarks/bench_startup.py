@@ -0,0 +1,79 @@
+"""Startup benchmark: import cost of the service modules and of the lazily loaded extractor dependencies.
+
+Every measurement runs in a fresh interpreter so nothing is shared between modules.
+Run from the repository root: python benchmarks/bench_startup.py [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by the API process itself; these should stay cheap
+SERVICE_MODULES = (
+    'app',
+    'extract_text_wordpdf',
+    'extractmsg',
+    'attachment_pool',
+    'extract_emailbody',
+    'email_message',
+    'link_fetcher',
+    'extraction_cache',
+    'job_queue',
+)
+
+MEASURE_IMPORT = """
+import sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+print('timing', time.perf_counter() - started)
+"""
+
+MEASURE_WARM_UP = """
+import time
+from warmup import warm_up
+started = time.perf_counter()
+timings = warm_up()
+total = time.perf_counter() - started
+for name, seconds in timings.items():
+    print(f'timing {name} {seconds}')
+print(f'timing total {total}')
+"""
+
+
+def run(script, *args):
+    # Dummy Azure settings keep the clients constructible without touching the network
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    for name in ('endpoint', 'AZURE_FORM_RECOGNIZER_ENDPOINT'):
+        env.setdefault(name, 'https://example.invalid')
+    for name in ('subscription_key', 'AZURE_FORM_RECOGNIZER_KEY'):
+        env.setdefault(name, 'benchmark')
+    env['WARM_UP_ON_START'] = ''
+    result = subprocess.run(
+        [sys.executable, '-c', script, *args], capture_output=True, text=True, env=env, cwd=REPO_ROOT, check=True
+    )
+    # Extractors print as they load, so only the marked lines are measurements
+    return [line.split(' ', 1)[1] for line in result.stdout.splitlines() if line.startswith('timing ')]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Cold import time, median of {args.repeat} fresh interpreters")
+    for module in SERVICE_MODULES:
+        samples = [float(run(MEASURE_IMPORT, module)[0]) for _ in range(args.repeat)]
+        print(f"  {module:<24} {statistics.median(samples) * 1000:8.1f} ms")
+
+    print("Explicit warm-up, per step")
+    runs = [dict(line.rsplit(' ', 1) for line in run(MEASURE_WARM_UP)) for _ in range(args.repeat)]
+    for name in runs[0]:
+        samples = [float(timings[name]) for timings in runs if name in timings]
+        print(f"  {name:<56} {statistics.median(samples) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
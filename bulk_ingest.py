@@ -0,0 +1,174 @@
+import argparse
+import json
+import mailbox
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Backfill workers, one per core by default, and seconds between progress lines
+ingest_processes = int(os.getenv('INGEST_PROCESSES', os.cpu_count() or 1))
+ingest_report_interval = float(os.getenv('INGEST_REPORT_INTERVAL', 10))
+
+
+def iter_messages(path):
+    """Yields (message_id, filename, data) for every message under path.
+
+    path may be an mbox file, a Maildir, a single .eml/.msg file or a directory searched for them.
+    Message ids are built from the absolute path, so they stay stable across runs and can be checkpointed.
+    """
+    path = os.path.abspath(path)
+    if os.path.isdir(path):
+        if all(os.path.isdir(os.path.join(path, name)) for name in ('cur', 'new', 'tmp')):
+            maildir = mailbox.Maildir(path, factory=None, create=False)
+            for key in maildir.iterkeys():
+                yield f'{path}:{key}', 'message.eml', maildir.get_bytes(key)
+            return
+        for directory, subdirectories, filenames in os.walk(path):
+            subdirectories.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith(('.eml', '.msg', '.mbox')):
+                    yield from iter_messages(os.path.join(directory, filename))
+    elif path.lower().endswith(('.eml', '.msg')):
+        with open(path, 'rb') as message_file:
+            yield path, os.path.basename(path).lower(), message_file.read()
+    else:
+        mbox = mailbox.mbox(path, factory=None, create=False)
+        try:
+            for key in mbox.iterkeys():
+                yield f'{path}:{key}', 'message.eml', mbox.get_bytes(key)
+        finally:
+            mbox.close()
+
+
+def init_worker():
+    """Keeps each ingest worker from starting a full attachment process pool of its own, and warms it up."""
+    os.environ.setdefault('ATTACHMENT_PROCESS_WORKERS', '1')
+    from warmup import warm_up
+    warm_up()
+
+
+def process_message(message_id, filename, data):
+    """Runs the /upload extraction for one message and returns its JSON line record."""
+    # Imported here so the extractors load once inside each worker process
+    from app import process_upload
+    from workspace import Workspace
+
+    try:
+        with Workspace() as workspace:
+            upload = workspace.spool(filename, data)
+            record = process_upload(filename, upload, workspace)
+    except Exception as e:
+        record = {"error": f"Failed to process message: {e}"}
+    return {"id": message_id, **record}
+
+
+def load_checkpoint(checkpoint_path):
+    """Returns the ids of the messages a previous run already wrote out."""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, encoding='utf-8') as checkpoint:
+        return {line.rstrip('\n') for line in checkpoint if line.strip()}
+
+
+class Progress:
+    """Counts finished messages and periodically prints the throughput."""
+
+    def __init__(self, report_interval):
+        self.report_interval = report_interval
+        self.started = self.last_report = time.monotonic()
+        self.done = self.failed = self.skipped = self.last_done = 0
+
+    def add(self, record):
+        self.done += 1
+        if 'error' in record:
+            self.failed += 1
+        now = time.monotonic()
+        if now - self.last_report >= self.report_interval:
+            self.report(now)
+
+    def report(self, now=None, final=False):
+        now = now or time.monotonic()
+        overall = self.done / max(now - self.started, 1e-9)
+        recent = (self.done - self.last_done) / max(now - self.last_report, 1e-9)
+        label = 'Finished' if final else 'Processed'
+        print(f"{label} {self.done} messages ({self.failed} failed, {self.skipped} skipped): "
+              f"{recent:.1f} msgs/sec now, {overall:.1f} msgs/sec overall", flush=True)
+        self.last_report, self.last_done = now, self.done
+
+
+def ingest(paths, output_path, checkpoint_path=None, processes=None, report_interval=None):
+    """Extracts every message under paths into a JSONL file, skipping messages checkpointed before.
+
+    Records are written as messages finish, so their order follows completion, not the input.
+    """
+    checkpoint_path = checkpoint_path or f'{output_path}.checkpoint'
+    processes = processes or ingest_processes
+    done_ids = load_checkpoint(checkpoint_path)
+    progress = Progress(ingest_report_interval if report_interval is None else report_interval)
+    # Enough queued work to keep every worker busy without reading the whole archive into memory
+    max_in_flight = processes * 4
+
+    with open(output_path, 'a', encoding='utf-8') as output, \
+            open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+
+        def write(record):
+            output.write(json.dumps(record, default=str) + '\n')
+            output.flush()
+            # The id is checkpointed only once its line is written; a crash in between repeats one line at most
+            checkpoint.write(record['id'] + '\n')
+            checkpoint.flush()
+            progress.add(record)
+
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=init_worker)
+        in_flight = {}
+
+        def drain(return_when):
+            nonlocal pool
+            finished, _ = wait(in_flight, return_when=return_when)
+            broken = False
+            for future in finished:
+                message_id = in_flight.pop(future)
+                try:
+                    write(future.result())
+                except BrokenProcessPool:
+                    # Left out of the checkpoint so the next run retries it
+                    print(f"Worker crashed while processing {message_id}")
+                    broken = True
+            if broken:
+                # Everything else in flight died with the pool; collect it before starting a fresh one
+                if in_flight:
+                    drain(ALL_COMPLETED)
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=processes, initializer=init_worker)
+
+        try:
+            for path in paths:
+                for message_id, filename, data in iter_messages(path):
+                    if message_id in done_ids:
+                        progress.skipped += 1
+                        continue
+                    if len(in_flight) >= max_in_flight:
+                        drain(FIRST_COMPLETED)
+                    in_flight[pool.submit(process_message, message_id, filename, data)] = message_id
+            while in_flight:
+                drain(FIRST_COMPLETED)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            progress.report(final=True)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extracts mbox files, Maildirs and .eml/.msg files into JSON lines.')
+    parser.add_argument('paths', nargs='+', help='mbox files, Maildir directories, .eml/.msg files or directories of them')
+    parser.add_argument('-o', '--output', required=True, help='JSONL file to append results to')
+    parser.add_argument('--checkpoint', default=None, help='file of finished message ids (default: OUTPUT.checkpoint)')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--report-interval', type=float, default=None, help='seconds between throughput reports')
+    args = parser.parse_args()
+    ingest(args.paths, args.output, args.checkpoint, args.processes, args.report_interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+from collections import defaultdict
+import numpy as np
+
+# Upper bound on the size of one marks x lines distance block
+MAX_DISTANCE_BLOCK = 4 * 1024 * 1024
+
+
+def polygon_centroids(polygons):
+    """Returns the centroid of each polygon as an (n, 2) array."""
+    centroids = np.empty((len(polygons), 2), dtype=np.float64)
+    for i, polygon in enumerate(polygons):
+        centroids[i, 0] = sum([point[0] for point in polygon]) / len(polygon)
+        centroids[i, 1] = sum([point[1] for point in polygon]) / len(polygon)
+    return centroids
+
+
+def nearest_indices(points, targets):
+    """Returns, for every point, the index of the closest target; ties go to the first target."""
+    nearest = np.empty(len(points), dtype=np.intp)
+    block = max(1, MAX_DISTANCE_BLOCK // max(1, len(targets)))
+    for start in range(0, len(points), block):
+        chunk = points[start:start + block]
+        deltas = chunk[:, None, :] - targets[None, :, :]
+        nearest[start:start + block] = np.einsum('ijk,ijk->ij', deltas, deltas).argmin(axis=1)
+    return nearest
+
+
+def associate_checkboxes(selection_marks, text_lines):
+    """Associate every selection mark with the nearest text line on its page.
+
+    Centroids are computed once per page and the nearest line is found with vectorized
+    distances. Marks keep their original order and each option text is reported once.
+    """
+    lines_by_page = defaultdict(list)
+    for line in text_lines:
+        lines_by_page[line["Page"]].append(line)
+    marks_by_page = defaultdict(list)
+    for index, selection_mark in enumerate(selection_marks):
+        marks_by_page[selection_mark["Page"]].append(index)
+
+    nearest_texts = [None] * len(selection_marks)
+    for page, mark_indices in marks_by_page.items():
+        page_lines = lines_by_page.get(page)
+        if not page_lines:
+            continue
+        line_centers = polygon_centroids([line["Polygon"] for line in page_lines])
+        mark_centers = polygon_centroids([selection_marks[index]["Polygon"] for index in mark_indices])
+        for index, line_index in zip(mark_indices, nearest_indices(mark_centers, line_centers)):
+            nearest_texts[index] = page_lines[line_index]["Text"]
+
+    checkboxes = []
+    seen_options = set()
+    for selection_mark, nearest_text in zip(selection_marks, nearest_texts):
+        if nearest_text and nearest_text not in seen_options:
+            checkboxes.append({
+                "Page": selection_mark["Page"],
+                "State": selection_mark["State"],
+                "Option": nearest_text
+            })
+            seen_options.add(nearest_text)
+
+    return checkboxes
@@ -0,0 +1,210 @@
+import multiprocessing
+import os
+import re
+import struct
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Spire.Doc worker processes kept warm for the .doc files the native reader cannot handle
+doc_process_workers = int(os.getenv('DOC_PROCESS_WORKERS', 2))
+doc_extract_timeout = float(os.getenv('DOC_EXTRACT_TIMEOUT', 120))
+
+SPIRE_WATERMARK = "Evaluation Warning: The document was created with Spire.Doc for Python."
+
+# File Information Block offsets of the Word 97-2003 binary format (MS-DOC 2.5)
+FIB_IDENT = 0xA5EC
+FIB_MIN_WORD97 = 0xC1
+FIB_FLAGS = 0x000A
+FIB_ENCRYPTED = 0x0100
+FIB_WHICH_TABLE_STREAM = 0x0200
+FIB_CCP_TEXT = 0x004C
+FIB_FC_CLX = 0x01A2
+FIB_LCB_CLX = 0x01A6
+# A piece stored as 8-bit text has this bit set in its file offset, which is then doubled
+PIECE_COMPRESSED = 0x40000000
+
+# Field codes sit between the begin and separator marks; only the result after the separator is text
+FIELD_MARKS = re.compile('[\x13\x14\x15]')
+# Paragraph, cell and line marks become whitespace; other control characters are anchors for objects
+CONTROL_CHARACTERS = {code: None for code in range(0x20) if code not in (0x09, 0x0A)}
+CONTROL_CHARACTERS.update({0x0D: '\n', 0x07: '\t', 0x0B: '\n', 0x0C: '\n', 0x1E: '-'})
+
+_doc_pool = None
+_doc_pool_lock = threading.Lock()
+
+
+class UnsupportedDocument(Exception):
+    """A .doc file the native reader leaves to Spire, such as an encrypted or pre-97 document."""
+
+
+def read_clx_pieces(clx):
+    """Returns the (first cp, last cp, file offset, compressed) pieces of a Clx structure."""
+    position = 0
+    # Leading Prc entries hold formatting only
+    while position < len(clx) and clx[position] == 0x01:
+        position += 3 + struct.unpack_from('<H', clx, position + 1)[0]
+    if position >= len(clx) or clx[position] != 0x02:
+        raise UnsupportedDocument('piece table not found')
+    length = struct.unpack_from('<I', clx, position + 1)[0]
+    plc = clx[position + 5:position + 5 + length]
+    count = (len(plc) - 4) // 12
+    cps = struct.unpack_from(f'<{count + 1}I', plc, 0)
+    pieces = []
+    for i in range(count):
+        fc = struct.unpack_from('<I', plc, 4 * (count + 1) + 8 * i + 2)[0]
+        compressed = bool(fc & PIECE_COMPRESSED)
+        offset = (fc & ~PIECE_COMPRESSED) // 2 if compressed else fc
+        pieces.append((cps[i], cps[i + 1], offset, compressed))
+    return pieces
+
+
+def strip_fields(text):
+    """Drops field codes such as HYPERLINK or PAGE and keeps their displayed results, nested fields included."""
+    if '\x13' not in text:
+        return text
+    parts = []
+    # One entry per open field: True while inside its code, False once in its result
+    fields = []
+    position = 0
+    for mark in FIELD_MARKS.finditer(text):
+        if not any(fields):
+            parts.append(text[position:mark.start()])
+        character = mark.group()
+        if character == '\x13':
+            fields.append(True)
+        elif fields and character == '\x14':
+            fields[-1] = False
+        elif fields:
+            fields.pop()
+        position = mark.end()
+    if not any(fields):
+        parts.append(text[position:])
+    return ''.join(parts)
+
+
+def read_word97_text(data):
+    """Reads the main document text of a Word 97-2003 .doc file from its piece table.
+
+    Only the OLE streams are parsed, so this needs neither Spire nor a temporary file.
+    """
+    import olefile
+
+    with olefile.OleFileIO(data) as ole:
+        if not ole.exists('WordDocument'):
+            raise UnsupportedDocument('no WordDocument stream')
+        word_document = ole.openstream('WordDocument').read()
+        ident, fib_version = struct.unpack_from('<HH', word_document, 0)
+        if ident != FIB_IDENT or fib_version < FIB_MIN_WORD97:
+            raise UnsupportedDocument('not a Word 97-2003 document')
+        flags = struct.unpack_from('<H', word_document, FIB_FLAGS)[0]
+        if flags & FIB_ENCRYPTED:
+            raise UnsupportedDocument('encrypted document')
+        table_name = '1Table' if flags & FIB_WHICH_TABLE_STREAM else '0Table'
+        if not ole.exists(table_name):
+            raise UnsupportedDocument(f'no {table_name} stream')
+        table = ole.openstream(table_name).read()
+
+    text_length = struct.unpack_from('<i', word_document, FIB_CCP_TEXT)[0]
+    fc_clx, lcb_clx = struct.unpack_from('<iI', word_document, FIB_FC_CLX)
+    if lcb_clx == 0 or fc_clx + lcb_clx > len(table):
+        raise UnsupportedDocument('invalid piece table location')
+
+    chunks = []
+    for first_cp, last_cp, offset, compressed in read_clx_pieces(table[fc_clx:fc_clx + lcb_clx]):
+        # Footnotes, headers and other stories follow the main text in the same character positions
+        last_cp = min(last_cp, text_length)
+        if first_cp >= last_cp:
+            continue
+        count = last_cp - first_cp
+        if compressed:
+            chunks.append(word_document[offset:offset + count].decode('cp1252', errors='replace'))
+        else:
+            chunks.append(word_document[offset:offset + 2 * count].decode('utf-16-le', errors='replace'))
+    return strip_fields(''.join(chunks)).translate(CONTROL_CHARACTERS)
+
+
+def strip_watermark(text):
+    """Removes the watermark paragraph the Spire.Doc evaluation build adds to what it reads and saves."""
+    if SPIRE_WATERMARK not in text:
+        return text
+    for paragraph_end in ('\r\n', '\n'):
+        text = text.replace(SPIRE_WATERMARK + paragraph_end, '').replace(paragraph_end + SPIRE_WATERMARK, '')
+    return text
+
+
+def warm_spire():
+    """Loads the Spire.Doc runtime once per worker process, ahead of the first document."""
+    warnings.filterwarnings("ignore")
+    import spire.doc  # noqa: F401
+
+
+def spire_doc_text(data):
+    """Extracts the text of a .doc file's bytes with Spire.Doc."""
+    from spire.doc import Document, FileFormat, Stream
+    warnings.filterwarnings("ignore")
+    document = Document()
+    try:
+        document.LoadFromStream(Stream(data), FileFormat.Auto)
+        document_text = document.GetText()
+    finally:
+        document.Close()
+    return strip_watermark(document_text)
+
+
+def get_doc_pool():
+    """Returns the shared pool of warm Spire.Doc workers, creating it on first use."""
+    global _doc_pool
+    with _doc_pool_lock:
+        if _doc_pool is None:
+            # Spawned rather than forked: a child forked after Spire's native runtime ran in the parent hangs
+            _doc_pool = ProcessPoolExecutor(max_workers=doc_process_workers, initializer=warm_spire,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _doc_pool
+
+
+def reset_doc_pool(broken_pool):
+    """Drops a pool that lost a worker, such as to a crash in the Spire runtime, so the next file gets a fresh one."""
+    global _doc_pool
+    with _doc_pool_lock:
+        if _doc_pool is broken_pool:
+            _doc_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def terminate_doc_pool(pool):
+    """Drops a pool and kills its workers, so a document hung in Spire stops holding a worker slot."""
+    # ProcessPoolExecutor cannot cancel a running task, so its worker processes are terminated directly
+    processes = list((pool._processes or {}).values())
+    reset_doc_pool(pool)
+    for process in processes:
+        process.terminate()
+
+
+def spire_doc_text_pooled(data):
+    """Runs Spire.Doc in a warm worker process, or inline when already inside a worker or the pool is disabled."""
+    if doc_process_workers <= 0 or multiprocessing.parent_process() is not None:
+        return spire_doc_text(data)
+    pool = get_doc_pool()
+    try:
+        return pool.submit(spire_doc_text, data).result(timeout=doc_extract_timeout)
+    except BrokenProcessPool:
+        reset_doc_pool(pool)
+        raise
+    except TimeoutError:
+        # Documents running alongside the hung one fail with it, but later files get fresh workers
+        print(f"Spire.Doc did not finish within {doc_extract_timeout} seconds, restarting its workers")
+        terminate_doc_pool(pool)
+        raise
+
+
+def doc_to_text(data):
+    """Returns the text of a .doc file's bytes, natively when possible and with Spire.Doc otherwise."""
+    try:
+        text = strip_watermark(read_word97_text(data))
+        if text.strip():
+            return text
+    except Exception as e:
+        print(f"Native .doc extraction failed ({e}), using Spire.Doc")
+    return spire_doc_text_pooled(data)
@@ -0,0 +1,133 @@
+import os
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+from workspace import SpooledFile, Workspace, open_binary
+
+# Text budget for one document, and whether pandoc may retry documents the native reader rejects
+docx_max_chars = int(os.getenv('DOCX_MAX_CHARS', 20 * 1024 * 1024))
+docx_pandoc_fallback = os.getenv('DOCX_PANDOC_FALLBACK', '').lower() in ('1', 'true', 'yes')
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+TEXT = W + 't'
+TAB = W + 'tab'
+BREAKS = {W + 'br', W + 'cr'}
+HYPHENS = {W + 'noBreakHyphen': '-', W + 'softHyphen': ''}
+PARAGRAPH = W + 'p'
+CELL = W + 'tc'
+ROW = W + 'tr'
+TABLE = W + 'tbl'
+# Text boxes repeat their text in a VML fallback for older readers
+FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+# Headers and footers come in numbered parts; the body sits between them in reading order
+HEADER_PART = re.compile(r'word/header(\d*)\.xml')
+FOOTER_PART = re.compile(r'word/footer(\d*)\.xml')
+DOCUMENT_PART = 'word/document.xml'
+
+
+def numbered_parts(names, pattern):
+    """Returns the part names matching pattern, ordered by their number."""
+    numbered = []
+    for name in names:
+        match = pattern.fullmatch(name)
+        if match:
+            numbered.append((int(match.group(1) or 0), name))
+    return [name for _, name in sorted(numbered)]
+
+
+def iter_part_text(stream):
+    """Streams the text of one WordprocessingML part, element by element.
+
+    Paragraphs end in a line break; table cells are tab-separated and rows end in a line break.
+    Deleted revisions and field codes are left out, since they are not in w:t elements.
+    """
+    cell_depth = 0
+    fallback_depth = 0
+    for event, element in iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if tag == CELL:
+                cell_depth += 1
+            elif tag == FALLBACK:
+                fallback_depth += 1
+            continue
+        if tag == FALLBACK:
+            fallback_depth -= 1
+            element.clear()
+        elif fallback_depth:
+            continue
+        elif tag == TEXT:
+            if element.text:
+                yield element.text
+        elif tag == TAB:
+            yield '\t'
+        elif tag in BREAKS:
+            yield '\n'
+        elif tag in HYPHENS:
+            yield HYPHENS[tag]
+        elif tag == PARAGRAPH:
+            # Paragraphs inside a cell stay on the row's line
+            yield ' ' if cell_depth else '\n'
+            element.clear()
+        elif tag == CELL:
+            cell_depth -= 1
+            yield '\t'
+        elif tag == ROW:
+            yield '\n'
+        elif tag == TABLE:
+            element.clear()
+
+
+def read_docx_text(source, max_chars=None):
+    """Extracts the headers, body (tables included) and footers of a DOCX file without leaving the process.
+
+    source is the file's bytes, a spooled file or a path; parts are streamed out of the zip, never fully loaded.
+    """
+    max_chars = docx_max_chars if max_chars is None else max_chars
+    texts = []
+    used = 0
+    with open_binary(source) as stream, zipfile.ZipFile(stream) as archive:
+        names = archive.namelist()
+        if DOCUMENT_PART not in names:
+            raise ValueError('Not a Word document: word/document.xml is missing')
+        parts = numbered_parts(names, HEADER_PART) + [DOCUMENT_PART] + numbered_parts(names, FOOTER_PART)
+        for part in parts:
+            pieces = []
+            with archive.open(part) as part_stream:
+                for piece in iter_part_text(part_stream):
+                    used += len(piece)
+                    if used > max_chars:
+                        break
+                    pieces.append(piece)
+            text = ''.join(pieces).strip()
+            # First-page, even and default headers often repeat the same text
+            if text and text not in texts:
+                texts.append(text)
+            if used > max_chars:
+                texts.append(f'[Truncated: more than {max_chars} characters]')
+                break
+    return '\n\n'.join(texts)
+
+
+def pandoc_docx_text(source):
+    """Converts a DOCX file to plain text with pandoc, in a separate process."""
+    import pypandoc
+    if isinstance(source, (bytes, bytearray)):
+        with Workspace() as workspace:
+            spooled_file = workspace.spool('document.docx', source)
+            return pypandoc.convert_file(spooled_file.to_path(), 'plain', format='docx')
+    if isinstance(source, SpooledFile):
+        source = source.to_path()
+    return pypandoc.convert_file(source, 'plain', format='docx')
+
+
+def docx_to_text(source):
+    """Returns the text of a DOCX file, read natively; pandoc retries rejected files when enabled."""
+    try:
+        return read_docx_text(source)
+    except Exception as e:
+        if not docx_pandoc_fallback:
+            raise
+        print(f"Native DOCX extraction failed ({e}), falling back to pandoc")
+        return pandoc_docx_text(source)
@@ -0,0 +1,140 @@
+import itertools
+from functools import cached_property
+from email import policy
+from email.parser import BytesParser
+from email.header import decode_header, make_header
+from text_encoding import decode_bytes
+
+# Serialising embedded messages must not re-fold long header lines
+EMBEDDED_MESSAGE_POLICY = policy.default.clone(max_line_length=0)
+
+
+def decode_mime_words(s):
+    return str(make_header(decode_header(s)))
+
+
+class EmailAttachment:
+    """An attachment of a parsed email; its payload is decoded on first access."""
+
+    def __init__(self, part, filename):
+        self.part = part
+        self.filename = filename
+        self.content_type = part.get_content_type()
+
+    @property
+    def is_message(self):
+        return self.content_type == 'message/rfc822'
+
+    @cached_property
+    def message(self):
+        """The embedded email of a message/rfc822 attachment, sharing the already parsed tree."""
+        if not self.is_message:
+            return None
+        return ParsedEmail(self.part.get_payload()[0])
+
+    @cached_property
+    def data(self):
+        """The decoded attachment bytes."""
+        if self.is_message:
+            embedded_message = self.part.get_payload()[0]
+            try:
+                return embedded_message.as_bytes(policy=EMBEDDED_MESSAGE_POLICY)
+            except UnicodeEncodeError:
+                return embedded_message.as_string(policy=EMBEDDED_MESSAGE_POLICY).encode('utf-8', 'replace')
+        return self.part.get_payload(decode=True) or b''
+
+
+class ParsedEmail:
+    """An email parsed once per upload, shared by the header, body and attachment extractors."""
+
+    def __init__(self, message):
+        self.message = message
+
+    @classmethod
+    def from_bytes(cls, eml_data):
+        return cls(BytesParser(policy=policy.default).parsebytes(eml_data))
+
+    @classmethod
+    def load(cls, source):
+        """Returns a ParsedEmail for an existing instance, raw bytes, a spooled file or a path."""
+        if isinstance(source, cls):
+            return source
+        if isinstance(source, (bytes, bytearray)):
+            return cls.from_bytes(bytes(source))
+        if hasattr(source, 'getvalue'):
+            return cls.from_bytes(source.getvalue())
+        with open(source, 'rb') as f:
+            return cls(BytesParser(policy=policy.default).parse(f))
+
+    def header(self, name):
+        """Returns the decoded header value, or None when the header is missing."""
+        value = self.message[name]
+        if not value:
+            return None
+        return decode_mime_words(value)
+
+    @cached_property
+    def headers(self):
+        """Decoded Subject/From/To headers and the raw Date header."""
+        return {
+            'Subject': self.header('subject'),
+            'From': self.header('from'),
+            'To': self.header('to'),
+            'Date': self.message['date'],
+        }
+
+    @cached_property
+    def text_parts(self):
+        """Decoded inline text/plain and text/html body parts in document order, as (content_type, text) pairs.
+
+        Parts sent as attachments, text files included, are left to the attachment extractors.
+        """
+        text_parts = []
+
+        def collect(part):
+            if part.get_content_disposition() == 'attachment':
+                return
+            content_type = part.get_content_type()
+            if content_type in ('text/plain', 'text/html'):
+                payload = part.get_payload(decode=True) or b''
+                # The declared charset is used only when the payload actually decodes with it
+                text = decode_bytes(payload, part.get_content_charset())
+                text_parts.append((content_type, text))
+            elif part.is_multipart():
+                for subpart in part.iter_parts():
+                    collect(subpart)
+
+        collect(self.message)
+        return text_parts
+
+    @cached_property
+    def attachments(self):
+        """Attachment parts in the order and with the generated part-NNN names eml_parser uses.
+
+        Unlike eml_parser, the parts of an embedded message are not flattened into this list;
+        they belong to the embedded message, which is extracted on its own.
+        """
+        attachments = []
+        counter = itertools.count()
+
+        def add(part):
+            part_number = next(counter)
+            filename = part.get_filename('') or f'part-{part_number:03d}'
+            attachments.append(EmailAttachment(part, filename))
+
+        def is_attachment(part):
+            if 'content-disposition' in part and part.get_content_disposition() != 'inline':
+                return True
+            return part.get_content_maintype() != 'text'
+
+        def traverse(part):
+            if part.get_content_type() == 'message/rfc822':
+                add(part)
+            elif part.is_multipart():
+                for subpart in part.get_payload():
+                    traverse(subpart)
+            elif is_attachment(part):
+                add(part)
+
+        traverse(self.message)
+        return attachments
@@ -1,12 +1,6 @@
-import warnings
-from spire.doc import *
+from extract_text_wordpdf import read_file_data
 
 def extract_text_from_doc(doc_file):
-    warnings.filterwarnings("ignore")
-    document = Document()
-    document.LoadFromFile(doc_file)
-    document_text = document.GetText()
-    document.Close()
-    document_text = document_text.replace("\r\nEvaluation Warning: The document was created with Spire.Doc for Python.", "")
-
-    return document_text
+    # The piece table is read natively; Spire.Doc, kept warm in worker processes, handles the rest
+    from doc_engine import doc_to_text
+    return doc_to_text(read_file_data(doc_file))
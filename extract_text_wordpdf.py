@@ -1,32 +1,32 @@
-import base64
-import os
-import time
-import extract_msg
-import pandas as pd
-from io import BytesIO
-from bs4 import BeautifulSoup
-from azure.cognitiveservices.vision.computervision import ComputerVisionClient
-from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
-from msrest.authentication import CognitiveServicesCredentials
-from dotenv import load_dotenv
-import fitz
-import pypandoc
 import json
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
-load_dotenv()
-
-subscription_key = os.getenv('subscription_key')
-endpoint = os.getenv('endpoint')
-computervision_client = ComputerVisionClient(endpoint, CognitiveServicesCredentials(subscription_key))
-
-form_recognizer_key = os.getenv('AZURE_FORM_RECOGNIZER_KEY')
-form_recognizer_endpoint = os.getenv('AZURE_FORM_RECOGNIZER_ENDPOINT')
-form_recognizer_client = DocumentAnalysisClient(form_recognizer_endpoint, AzureKeyCredential(form_recognizer_key))
+from azure_clients import get_computervision_client, get_form_recognizer_client
+from ocr_engine import OcrError, read_text, read_texts
+from extraction_cache import cached_extractor
+from metrics import span
+from html_engine import parse_html
+from text_encoding import decode_bytes, decode_html
+from text_normalizer import normalize_result
+
+# Heavy dependencies (openpyxl, fitz, lxml, extract_msg, numpy and the Azure SDKs) are
+# imported inside the extractors that need them, so importing this module stays cheap
+
+# Bump these whenever the output of the cached extractors changes
+PDF_EXTRACTOR_VERSION = '4'
+IMAGE_EXTRACTOR_VERSION = '2'
+
+def read_file_data(file_data):
+    """Returns the raw bytes of a file path, a spooled file or in-memory data."""
+    if isinstance(file_data, (bytes, bytearray)):
+        return bytes(file_data)
+    if hasattr(file_data, 'getvalue'):
+        return file_data.getvalue()
+    with open(file_data, 'rb') as f:
+        return f.read()
 
 def extract_doc(file_name):
-    output = pypandoc.convert_file(file_name, 'rst')
-    return output
+    """Extract text from a DOCX file given as a path, spooled file or bytes, without spawning pandoc."""
+    from docx_engine import docx_to_text
+    return docx_to_text(file_name)
 
 
 # def extract_text_from_txt(file_path):
@@ -36,16 +36,8 @@ def extract_doc(file_name):
 #     return txt_text
 
 def extract_text_from_txt(file_path):
-    """Extract text from a txt file"""
-    encodings = ['utf-8', 'utf-16', 'latin-1']
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as txt_file:
-                txt_text = txt_file.read()
-            return txt_text
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-    raise ValueError(f"Unable to decode the file {file_path} with the provided encodings.")
+    """Extract text from a txt file, decoded once with the encoding detected from its start"""
+    return decode_bytes(read_file_data(file_path))
 
 
 
@@ -61,28 +53,21 @@ def extract_text_from_txt(file_path):
 
 
 def extract_text_from_csv(file_path):
-    """Extract text from a CSV file."""
-    encodings = ['utf-8','utf-16', 'latin-1']
-    for encoding in encodings:
-        try:
-            df = pd.read_csv(file_path, encoding=encoding, on_bad_lines='skip')
-            text = df.to_string(index=False)
-            return text
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            print(f"Error extracting text from CSV with encoding {encoding}: {e}")
-            return ""
-    raise ValueError(f"Unable to decode the file {file_path} with the provided encodings.")
+    """Extract text from a CSV file as tab-separated rows, streamed within the spreadsheet limits."""
+    from spreadsheet_engine import csv_to_text
+    try:
+        return csv_to_text(file_path)
+    except Exception as e:
+        print(f"Error extracting text from CSV: {e}")
+        return ""
 
 
 
 def extract_text_from_xlsx(file_path):
-    """Extract text from an XLSX file."""
+    """Extract text from every sheet of an XLSX file as tab-separated rows, streamed within the spreadsheet limits."""
+    from spreadsheet_engine import xlsx_to_text
     try:
-        df = pd.read_excel(file_path)
-        text = df.to_string(index=False)
-        return text
+        return xlsx_to_text(file_path)
     except Exception as e:
         print(f"Error extracting text from XLSX: {e}")
         return ""
@@ -90,171 +75,38 @@ def extract_text_from_xlsx(file_path):
 def extract_text_from_html(file_path):
     """Extract text from an HTML file."""
     try:
-        with open(file_path, 'r') as html_file:
-            soup = BeautifulSoup(html_file, 'html.parser')
-            text = soup.get_text()
-        return text
+        return parse_html(decode_html(read_file_data(file_path))).text
     except Exception as e:
         print(f"Error extracting text from HTML: {e}")
         return ""
 
 
-#For regular pdfs or attachments
-def extract_pdf_text(file_path):
-    """Extract text from a PDF file."""
-    doc = fitz.open(file_path)
-    full_text = ""
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        text = page.get_text()
-        full_text += text
-    return full_text
-
-def convert_pdf_to_images(file_path):
-    """Convert PDF pages to images."""
-    doc = fitz.open(file_path)
-    image_paths = []
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        pix = page.get_pixmap()
-        image_path = f"page_{page_num + 1}.png"
-        pix.save(image_path)
-        image_paths.append(image_path)
-    return image_paths
-
-def extract_text_from_image(image_path):
-    """Extract text from an image file using Azure Vision OCR."""
-    try:
-        with open(image_path, "rb") as image_stream:
-            ocr_result = computervision_client.read_in_stream(image_stream, raw=True)
-        
-        operation_location = ocr_result.headers["Operation-Location"]
-        operation_id = operation_location.split("/")[-1]
-
-        while True:
-            result = computervision_client.get_read_result(operation_id)
-            if result.status not in ['notStarted', 'running']:
-                break
-            time.sleep(1)
-
-        if result.status == OperationStatusCodes.succeeded:
-            text = ""
-            for read_result in result.analyze_result.read_results:
-                for line in read_result.lines:
-                    text += line.text + " "
-            return text
-        else:
-            print("Sorry, the image quality is not sufficient for text extraction. Please try again with a clearer image.")
-            return ""
-    except Exception as e:
-        print("Image is invalid for text extraction.")
-        return ""
-
-def is_text_based_pdf(file_path):
-    """Check if a PDF file is text-based or scanned."""
-    doc = fitz.open(file_path)
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        text = page.get_text()
-        if text.strip():
-            return True
-    return False
-
-def process_pdf(file_path):
-    """Process the PDF file to extract text."""
-    if not file_path.lower().endswith('.pdf'):
-        raise ValueError("The provided file is not a PDF.")
-
-    if is_text_based_pdf(file_path):
-        print("The PDF is text-based. Extracting text...")
-        return extract_pdf_text(file_path)
-    else:
-        print("The PDF contains scanned images. Performing OCR...")
-        try:
-            image_paths = convert_pdf_to_images(file_path)
-            full_text = ""
-            for image_path in image_paths:
-                text = extract_text_from_image(image_path)
-                full_text += text
-                os.remove(image_path)
-            return full_text
-        except Exception as e:
-            print("Sorry, the image quality is not sufficient for text extraction. Please try again with a clearer image.")
-            return ""
-        
-
-
-#For direct pdfs
-
-def extract_text_from_pdf_upload(pdf_data):
-    """Extract text from a PDF file."""
-    doc = fitz.open(stream=pdf_data, filetype="pdf")
-    full_text = ""
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        #full_text += page.get_text()
-        full_text += page.get_text("layout")
-    return full_text
-
-def is_text_based_pdf_upload(pdf_data):
-    """Check if a PDF file is text-based or scanned."""
-    doc = fitz.open(stream=pdf_data, filetype="pdf")
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        if page.get_text().strip():
-            return True
-    return False
-
-def convert_pdf_to_images_upload(pdf_data):
-    """Convert PDF pages to images with higher DPI for better OCR results."""
-    doc = fitz.open(stream=pdf_data, filetype="pdf")
-    image_paths = []
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        pix = page.get_pixmap(dpi=600)
-        image_path = f"page_{page_num + 1}.png"
-        pix.save(image_path)
-        image_paths.append(image_path)
-    return image_paths
-
-def extract_text_from_image_upload(image_path):
-    """Extract text from an image file using Azure Vision OCR."""
-    try:
-        with open(image_path, "rb") as image_stream:
-            ocr_result = computervision_client.read_in_stream(image_stream,reading_order="natural", raw=True)
-
-        operation_location = ocr_result.headers["Operation-Location"]
-        operation_id = operation_location.split("/")[-1]
-
-        while True:
-            result = computervision_client.get_read_result(operation_id)
-            if result.status not in ['notStarted', 'running']:
-                break
-            time.sleep(1)
-
-        if result.status == OperationStatusCodes.succeeded:
-            text = ""
-            for read_result in result.analyze_result.read_results:
-                for line in read_result.lines:
-                    text += line.text + " "
-            return text
-        else:
-            print("OCR failed: insufficient image quality.")
-            return ""
-    except Exception as e:
-        print(f"Image is invalid for text extraction: {e}")
-        return ""
-
-def extract_selection_marks_and_text_upload(pdf_data):
-    """Extract selection marks and text lines from the document."""
-    try:
-        poller = form_recognizer_client.begin_analyze_document("prebuilt-document", pdf_data)
-        result = poller.result()
-
+class DocumentAnalysis:
+    """Selection marks, text lines and tables derived from a single Form Recognizer analysis."""
+
+    def __init__(self, result):
+        self.result = result
+
+    @classmethod
+    def from_document(cls, document_data):
+        """Runs the prebuilt-document model once on PDF or image bytes, or a spooled upload."""
+        if getattr(document_data, 'in_memory', None) is False:
+            # Uploads spilled to disk are streamed from the file instead of loaded into memory
+            with open(document_data.to_path(), 'rb') as document, span('form_recognizer'):
+                poller = get_form_recognizer_client().begin_analyze_document("prebuilt-document", document)
+                return cls(poller.result())
+        if hasattr(document_data, 'getvalue'):
+            document_data = document_data.getvalue()
+        with span('form_recognizer'):
+            poller = get_form_recognizer_client().begin_analyze_document("prebuilt-document", document_data)
+            return cls(poller.result())
+
+    def selection_marks_and_text(self):
+        """Extract selection marks and text lines from the analysis result."""
         selection_marks = []
         text_lines = []
 
-        for page in result.pages:
+        for page in self.result.pages:
             for selection_mark in page.selection_marks:
                 selection_marks.append({
                     "Page": page.page_number,
@@ -271,102 +123,82 @@ def extract_selection_marks_and_text_upload(pdf_data):
                 print(f"Text Line: Page {page.page_number}, Text {line.content}, Polygon {line.polygon}")
 
         return selection_marks, text_lines
+
+    def tables(self):
+        """Extract tables from the analysis result as lists of rows."""
+        tables = []
+        for table in self.result.tables:
+            table_data = []
+            for cell in table.cells:
+                while len(table_data) <= cell.row_index:
+                    table_data.append([""] * table.column_count)  # Pre-fill the row
+                table_data[cell.row_index][cell.column_index] = cell.content
+            tables.append(table_data)
+        return tables
+
+def extract_selection_marks_and_text_upload(pdf_data):
+    """Extract selection marks and text lines from the document."""
+    try:
+        return DocumentAnalysis.from_document(pdf_data).selection_marks_and_text()
     except Exception as e:
         print(f"Error extracting selection marks and text: {e}")
         return [], []
 
 def associate_checkboxes_with_options_upload(selection_marks, text_lines):
     """Associate checkboxes with their nearest text options."""
-    checkboxes = []
-    
-    seen_options = set()
-
-    for selection_mark in selection_marks:
-        nearest_text = None
-        min_distance = float('inf')
-        for line in text_lines:
-            if line["Page"] == selection_mark["Page"]:
-                # Calculate the distance between the selection mark and the line
-                line_center_x = sum([point[0] for point in line["Polygon"]]) / len(line["Polygon"])
-                line_center_y = sum([point[1] for point in line["Polygon"]]) / len(line["Polygon"])
-                selection_mark_center_x = sum([point[0] for point in selection_mark["Polygon"]]) / len(selection_mark["Polygon"])
-                selection_mark_center_y = sum([point[1] for point in selection_mark["Polygon"]]) / len(selection_mark["Polygon"])
-                distance = ((line_center_x - selection_mark_center_x) ** 2 + (line_center_y - selection_mark_center_y) ** 2) ** 0.5
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_text = line["Text"]
-
-        if nearest_text and nearest_text not in seen_options:
-            checkboxes.append({
-                "Page": selection_mark["Page"],
-                "State": selection_mark["State"],
-                "Option": nearest_text
-            })
-            seen_options.add(nearest_text)
-
-    return checkboxes
+    from checkbox_index import associate_checkboxes
+    return associate_checkboxes(selection_marks, text_lines)
 
 def format_checkboxes_as_json(checkboxes):
     """Format checkboxes as JSON objects."""
     return json.dumps(checkboxes, indent=4)
 
 def analyze_document_with_form_recognizer(pdf_data):
-    """Analyze the PDF document using Azure Form Recognizer to extract tables and checkboxes."""
+    """Analyze the PDF document using Azure Form Recognizer to extract tables and checkboxes.
+
+    A failed analysis returns empty tables and checkboxes with the reason under "errors".
+    """
     try:
-        selection_marks, text_lines = extract_selection_marks_and_text_upload(pdf_data)
+        # One analysis serves both the checkboxes and the tables
+        analysis = DocumentAnalysis.from_document(pdf_data)
+        selection_marks, text_lines = analysis.selection_marks_and_text()
         checkboxes = associate_checkboxes_with_options_upload(selection_marks, text_lines)
 
-        # Extract tables (as done previously)
-        poller = form_recognizer_client.begin_analyze_document("prebuilt-document", pdf_data)
-        result = poller.result()
-
-        tables = []
-        for table in result.tables:
-            table_data = []
-            for cell in table.cells:
-                while len(table_data) <= cell.row_index:
-                    table_data.append([""] * table.column_count)  # Pre-fill the row
-                table_data[cell.row_index][cell.column_index] = cell.content
-            tables.append(table_data)
-
         return {
-            "tables": tables,
+            "tables": analysis.tables(),
             "checkboxes": checkboxes
         }
     except Exception as e:
         print(f"Error analyzing document with Form Recognizer: {e}")
         return {
             "tables": [],
-            "checkboxes": []
+            "checkboxes": [],
+            "errors": [f"Form Recognizer analysis failed: {e}"]
         }
 
+def ocr_pdf_pages(image_paths):
+    """OCR the rendered pages of a PDF concurrently, returning texts in page order."""
+    return read_texts(get_computervision_client(), image_paths, reading_order="natural")
+
+@cached_extractor('process_pdf_upload', PDF_EXTRACTOR_VERSION)
 def process_pdf_upload(pdf_data):
-    """Process the PDF file to extract text, tables, and checkboxes."""
+    """Process the PDF file to extract text, tables, and checkboxes, normalized before they are cached."""
+    from pdf_engine import extract_pdf_pages_text
     try:
-        if is_text_based_pdf_upload(pdf_data):
-            print("The PDF is text-based. Extracting text and analyzing for tables and checkboxes...")
-            text = extract_text_from_pdf_upload(pdf_data)
-            analysis_results = analyze_document_with_form_recognizer(pdf_data)
-            return {
-                "text": text,
-                "tables": analysis_results.get("tables", []),
-                "checkboxes": analysis_results.get("checkboxes", [])
-            }
-        else:
-            print("The PDF contains scanned images. Performing OCR and analyzing for tables and checkboxes...")
-            image_paths = convert_pdf_to_images_upload(pdf_data)
-            full_text = ""
-            for image_path in image_paths:
-                text = extract_text_from_image_upload(image_path)
-                full_text += text
-                os.remove(image_path)
-
-            analysis_results = analyze_document_with_form_recognizer(pdf_data)
-            return {
-                "text": full_text,
-                "tables": analysis_results.get("tables", []),
-                "checkboxes": analysis_results.get("checkboxes", [])
-            }
+        # Typed pages keep their text layer; only image-only pages go to OCR
+        text, unread_pages = extract_pdf_pages_text(pdf_data, ocr_pdf_pages)
+        print("Analyzing the PDF for tables and checkboxes...")
+        analysis_results = analyze_document_with_form_recognizer(pdf_data)
+        result = {
+            "text": text,
+            "tables": normalize_result(analysis_results.get("tables", [])),
+            "checkboxes": normalize_result(analysis_results.get("checkboxes", []))
+        }
+        # A partial result is still returned, but the errors keep it out of the cache
+        errors = analysis_results.get("errors", []) + [f"OCR failed on page {page}" for page in unread_pages]
+        if errors:
+            result["errors"] = errors
+        return result
     except Exception as e:
         print(f"Error during PDF processing: {e}")
         return {}
@@ -375,139 +207,49 @@ def process_pdf_upload(pdf_data):
 
 #Image extraction:
 def extract_text_from_image_jpg(image_path):
-    """Extract text from an image file using Azure Vision OCR."""
-    try:
-        with open(image_path, "rb") as image_stream:  # Open the image file in binary mode
-            ocr_result = computervision_client.read_in_stream(image_stream, raw=True)
-
-        operation_location = ocr_result.headers["Operation-Location"]
-        operation_id = operation_location.split("/")[-1]
-
-        while True:
-            result = computervision_client.get_read_result(operation_id)
-            if result.status not in ['notStarted', 'running']:
-                break
-            time.sleep(1)
-
-        if result.status == OperationStatusCodes.succeeded:
-            text = ""
-            for read_result in result.analyze_result.read_results:
-                for line in read_result.lines:
-                    text += line.text + " "
-            return text
-        else:
-            print("OCR failed: insufficient image quality.")
-            return ""
-    except Exception as e:
-        print(f"Image is invalid for text extraction: {e}")
-        return ""
+    """Extract text from an image file using Azure Vision OCR, raising OcrError when it cannot be read."""
+    return read_text(get_computervision_client(), image_path)
 
 
 def extract_selection_marks_and_text_upload_image(image_data):
     """Extract selection marks and text lines from the document."""
-    try:
-        poller = form_recognizer_client.begin_analyze_document("prebuilt-document", image_data)
-        result = poller.result()
-
-        selection_marks = []
-        text_lines = []
-
-        for page in result.pages:
-            for selection_mark in page.selection_marks:
-                selection_marks.append({
-                    "Page": page.page_number,
-                    "State": selection_mark.state,
-                    "Polygon": selection_mark.polygon
-                })
-                print(f"Selection Mark: Page {page.page_number}, State {selection_mark.state}, Polygon {selection_mark.polygon}")
-            for line in page.lines:
-                text_lines.append({
-                    "Page": page.page_number,
-                    "Text": line.content,
-                    "Polygon": line.polygon
-                })
-                print(f"Text Line: Page {page.page_number}, Text {line.content}, Polygon {line.polygon}")
-
-        return selection_marks, text_lines
-    except Exception as e:
-        print(f"Error extracting selection marks and text: {e}")
-        return [], []
+    return extract_selection_marks_and_text_upload(image_data)
 
 def associate_checkboxes_with_options_upload_image(selection_marks, text_lines):
     """Associate checkboxes with their nearest text options."""
-    checkboxes = []
-    seen_options = set()
-
-    for selection_mark in selection_marks:
-        nearest_text = None
-        min_distance = float('inf')
-        for line in text_lines:
-            if line["Page"] == selection_mark["Page"]:
-                # Calculate the distance between the selection mark and the line
-                line_center_x = sum([point[0] for point in line["Polygon"]]) / len(line["Polygon"])
-                line_center_y = sum([point[1] for point in line["Polygon"]]) / len(line["Polygon"])
-                selection_mark_center_x = sum([point[0] for point in selection_mark["Polygon"]]) / len(selection_mark["Polygon"])
-                selection_mark_center_y = sum([point[1] for point in selection_mark["Polygon"]]) / len(selection_mark["Polygon"])
-                distance = ((line_center_x - selection_mark_center_x) ** 2 + (line_center_y - selection_mark_center_y) ** 2) ** 0.5
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_text = line["Text"]
-
-        if nearest_text and nearest_text not in seen_options:
-            checkboxes.append({
-                "Page": selection_mark["Page"],
-                "State": selection_mark["State"],
-                "Option": nearest_text
-            })
-            seen_options.add(nearest_text)
-        
-
-    return checkboxes
+    from checkbox_index import associate_checkboxes
+    return associate_checkboxes(selection_marks, text_lines)
 
 def format_checkboxes_as_json_image(checkboxes):
     """Format checkboxes as JSON objects."""
     return json.dumps(checkboxes, indent=4)
 
 def analyze_document_with_form_recognizer_image(image_data):
-    """Analyze the PDF document using Azure Form Recognizer to extract tables and checkboxes."""
-    try:
-        selection_marks, text_lines = extract_selection_marks_and_text_upload_image(image_data)
-        checkboxes = associate_checkboxes_with_options_upload_image(selection_marks, text_lines)
-
-        # Extract tables (as done previously)
-        poller = form_recognizer_client.begin_analyze_document("prebuilt-document", image_data)
-        result = poller.result()
-
-        tables = []
-        for table in result.tables:
-            table_data = []
-            for cell in table.cells:
-                while len(table_data) <= cell.row_index:
-                    table_data.append([""] * table.column_count)  # Pre-fill the row
-                table_data[cell.row_index][cell.column_index] = cell.content
-            tables.append(table_data)
-
-        return {
-            "tables": tables,
-            "checkboxes": checkboxes
-        }
-    except Exception as e:
-        print(f"Error analyzing document with Form Recognizer: {e}")
-        return {
-            "tables": [],
-            "checkboxes": []
-        }
+    """Analyze the image using Azure Form Recognizer to extract tables and checkboxes."""
+    return analyze_document_with_form_recognizer(image_data)
 
 
 def process_image_jpg(image_path):
     """Process the image file to extract text, tables, and checkboxes."""
     try:
-        with open(image_path, "rb") as image_stream:
-            image_data = image_stream.read()
+        image_data = read_file_data(image_path)
+    except Exception as e:
+        print(f"Error during image processing: {e}")
+        return {}
+    return process_image_data(image_data)
 
+@cached_extractor('process_image_jpg', IMAGE_EXTRACTOR_VERSION)
+def process_image_data(image_data):
+    """Extract text, tables, and checkboxes from image bytes."""
+    try:
         analysis_results = analyze_document_with_form_recognizer_image(image_data)
         
-        text = extract_text_from_image_jpg(image_path)
+        try:
+            text = extract_text_from_image_jpg(image_data)
+        except OcrError as e:
+            print(e)
+            text = ""
+            analysis_results["errors"] = analysis_results.get("errors", []) + [str(e)]
         
         text = remove_table_text_from_text(text, analysis_results["tables"])
         
@@ -528,82 +270,3 @@ def remove_table_text_from_text(text, tables):
             for cell in row:
                 text = text.replace(cell, "")
     return text
-
-    
-def extract_text_from_attachment(attachment):
-    """Extract text content from an attachment."""
-    file_name = attachment.longFilename if attachment.longFilename else attachment.shortFilename
-    file_data = attachment.data
-
-    if file_name.lower().endswith('.docx'):
-        print(f"Extracting text from docx file: {file_name}")
-        return extract_doc(file_data)
-
-    elif file_name.lower().endswith('.pdf'):
-        print(f"Extracting text from pdf file: {file_name}")
-        return process_pdf_upload(file_data)
-
-    elif file_name.lower().endswith('.txt'):
-        print(f"Extracting text from txt file: {file_name}")
-        return extract_text_from_txt(file_data)
-
-    elif file_name.lower().endswith('.csv'):
-        print(f"Extracting text from csv file: {file_name}")
-        return extract_text_from_csv(file_data)
-
-    elif file_name.lower().endswith('.xlsx'):
-        print(f"Extracting text from xlsx file: {file_name}")
-        return extract_text_from_xlsx(file_data)
-
-    elif file_name.lower().endswith('.html'):
-        print(f"Extracting text from html file: {file_name}")
-        return extract_text_from_html(file_data)
-
-    elif file_name.lower().endswith(('.jpg', '.jpeg', '.png')):
-        print(f"Extracting text from image file: {file_name}")
-        with open("temp_image", "wb") as f:
-            f.write(file_data)
-        text = extract_text_from_image("temp_image")
-        os.remove("temp_image")
-        return text
-
-    else:
-        print(f"Unsupported file type: {file_name}. Returning base64 encoded content.")
-        return base64.b64encode(file_data).decode('utf-8')
-
-def extract_text_from_msg(file_path):
-    """Extract text content and attachments from an MSG file."""
-    try:
-        msg = extract_msg.Message(file_path)
-        attachments = []
-
-        for attachment in msg.attachments:
-            file_name = attachment.longFilename if attachment.longFilename else attachment.shortFilename
-            attachment_info = {
-                "filename": file_name,
-                "content": extract_text_from_attachment(attachment),
-                "filetype": file_name.split('.')[-1]
-            }
-            attachments.append(attachment_info)
-
-        return {
-            "Subject": msg.subject,
-            "From": msg.sender,
-            "To": msg.to,
-            "Date": msg.date,
-            "Body": msg.body,
-            "Attachments": attachments
-        }
-    except Exception as e:
-        print(f"Error extracting details from MSG: {e}")
-        return {"error": "Invalid attachment or MSG file."}
-
-
-def extract_attachment(file_path):
-    try:
-        with open(file_path, 'rb') as f:
-            msg = extract_msg(f)
-            return msg.body  
-    except Exception as e:
-        print("Error:", e)
-        return None
@@ -0,0 +1,204 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Memory and disk budgets of the two cache tiers; an empty path disables the disk tier
+extraction_cache_memory_bytes = int(os.getenv('EXTRACTION_CACHE_MEMORY_BYTES', 64 * 1024 * 1024))
+extraction_cache_disk_bytes = int(os.getenv('EXTRACTION_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+extraction_cache_path = os.getenv('EXTRACTION_CACHE_PATH', os.path.join('cache', 'extraction.sqlite3'))
+
+
+def cache_key(digest, extractor_name, extractor_version):
+    """Builds the content address of an extraction: SHA-256 of the bytes plus extractor name and version."""
+    return f'{extractor_name}:{extractor_version}:{digest}'
+
+
+class MemoryCache:
+    """Thread-safe LRU of serialized results bounded by their total size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DiskCache:
+    """SQLite store of serialized results, evicting the least recently used entries above max_bytes."""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS extractions ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS extractions_last_access ON extractions (last_access)')
+
+    def get(self, key):
+        with self._lock, self._connection:
+            row = self._connection.execute('SELECT value FROM extractions WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE extractions SET last_access = ? WHERE key = ?', (time.time(), key))
+            return row[0]
+
+    def put(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO extractions (key, value, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, value, size, time.time())
+            )
+            total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM extractions').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Drop the oldest entries until the store fits again
+            excess = total - self.max_bytes
+            evicted_keys = []
+            for evicted_key, evicted_size in self._connection.execute(
+                    'SELECT key, size FROM extractions WHERE key != ? ORDER BY last_access', (key,)):
+                evicted_keys.append((evicted_key,))
+                excess -= evicted_size
+                if excess <= 0:
+                    break
+            self._connection.executemany('DELETE FROM extractions WHERE key = ?', evicted_keys)
+
+
+class ExtractionCache:
+    """Two-tier cache of extraction results keyed on the attachment content."""
+
+    def __init__(self, memory_bytes=None, disk_path=None, disk_bytes=None):
+        self.memory = MemoryCache(extraction_cache_memory_bytes if memory_bytes is None else memory_bytes)
+        disk_path = extraction_cache_path if disk_path is None else disk_path
+        self.disk = DiskCache(disk_path, extraction_cache_disk_bytes if disk_bytes is None else disk_bytes) if disk_path else None
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+        self._counter_lock = threading.Lock()
+
+    def count(self, name):
+        with self._counter_lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        """Returns the hit and miss counters and the memory tier size."""
+        with self._counter_lock:
+            stats = dict(self._counters)
+        stats['memory_bytes'] = self.memory.size
+        return stats
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.count('memory_hits')
+            return json.loads(value)
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                print(f"Error reading extraction cache: {e}")
+                value = None
+            if value is not None:
+                self.count('disk_hits')
+                self.memory.put(key, value)
+                return json.loads(value)
+        self.count('misses')
+        return None
+
+    def put(self, key, result):
+        value = json.dumps(result)
+        self.memory.put(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, value)
+            except sqlite3.Error as e:
+                print(f"Error writing extraction cache: {e}")
+        self.count('stores')
+
+
+def is_cacheable(result):
+    """Only complete results are stored, so a failed OCR or analysis is retried next time.
+
+    Extractors report a partial result by listing what failed under "errors".
+    """
+    if not result:
+        return False
+    if isinstance(result, dict) and (not result.get('text') or result.get('errors')):
+        return False
+    return True
+
+
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Returns the process-wide extraction cache, opening the disk tier on first use."""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            try:
+                _extraction_cache = ExtractionCache()
+            except sqlite3.Error as e:
+                print(f"Extraction cache disk tier unavailable, using memory only: {e}")
+                _extraction_cache = ExtractionCache(disk_path='')
+        return _extraction_cache
+
+
+def cached_extractor(extractor_name, extractor_version):
+    """Decorates an extractor taking the document bytes so repeated documents skip all external calls.
+
+    Spooled uploads are passed through untouched and keyed on the hash computed while they arrived.
+    """
+    def decorator(extractor):
+        @functools.wraps(extractor)
+        def wrapper(data, *args, **kwargs):
+            digest = getattr(data, 'sha256', None)
+            if digest is None:
+                data = bytes(data)
+                digest = hashlib.sha256(data).hexdigest()
+            cache = get_extraction_cache()
+            key = cache_key(digest, extractor_name, extractor_version)
+            result = cache.get(key)
+            if result is not None:
+                print(f"Extraction cache hit for {extractor_name}")
+                return result
+            result = extractor(data, *args, **kwargs)
+            if is_cacheable(result):
+                cache.put(key, result)
+            return result
+        return wrapper
+    return decorator
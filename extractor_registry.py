@@ -0,0 +1,205 @@
+import os
+import threading
+import magic
+from extract_text_wordpdf import (
+    extract_doc,
+    process_pdf_upload,
+    extract_text_from_txt,
+    extract_text_from_csv,
+    extract_text_from_xlsx,
+    extract_text_from_html, process_image_jpg,
+    read_file_data
+)
+from extract_text_from_doc import extract_text_from_doc
+from metrics import span
+from text_normalizer import normalize_result
+from workspace import source_path
+
+# libmagic only needs the start of a file to recognise every format handled here
+SNIFF_BYTES = 8192
+
+PDF = 'application/pdf'
+DOC = 'application/msword'
+DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MSG = 'application/vnd.ms-outlook'
+EML = 'message/rfc822'
+CSV = 'text/csv'
+HTML = 'text/html'
+TXT = 'text/plain'
+JPEG = 'image/jpeg'
+PNG = 'image/png'
+
+# Names different libmagic versions use for the same formats
+MIME_ALIASES = {
+    'application/x-pdf': PDF,
+    'application/csv': CSV,
+    'image/jpg': JPEG,
+    'application/CDFV2': 'application/x-ole-storage',
+}
+
+EXTENSION_TYPES = {
+    'pdf': PDF,
+    'doc': DOC,
+    'docx': DOCX,
+    'xlsx': XLSX,
+    'msg': MSG,
+    'eml': EML,
+    'csv': CSV,
+    'html': HTML,
+    'htm': HTML,
+    'txt': TXT,
+    'jpg': JPEG,
+    'jpeg': JPEG,
+    'png': PNG,
+}
+
+# Metric labels for the detected types; anything else is counted as other
+FILETYPE_LABELS = {
+    PDF: 'pdf',
+    DOC: 'doc',
+    DOCX: 'docx',
+    XLSX: 'xlsx',
+    MSG: 'msg',
+    EML: 'eml',
+    CSV: 'csv',
+    HTML: 'html',
+    TXT: 'txt',
+    JPEG: 'image',
+    PNG: 'image',
+}
+
+# Container formats the bytes alone cannot pin down, with the types the extension may narrow them to
+AMBIGUOUS_TYPES = {
+    'application/zip': {DOCX, XLSX},
+    'application/x-ole-storage': {DOC, MSG},
+    TXT: {CSV, HTML, EML, TXT},
+    'application/octet-stream': set(EXTENSION_TYPES.values()),
+}
+
+_magic = threading.local()
+
+
+def get_filetype(file_name):
+    """Returns the lower-case extension of a file name without the dot."""
+    return os.path.splitext(file_name)[1][1:].lower()
+
+
+def filetype_label(mime_type):
+    """Returns the short file type a detected MIME type is reported under in the metrics."""
+    return FILETYPE_LABELS.get(mime_type, 'other')
+
+
+def read_prefix(source, size=SNIFF_BYTES):
+    """Returns the first bytes of in-memory data, a spooled file or a path."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source[:size])
+    if hasattr(source, 'seek'):
+        position = source.tell()
+        source.seek(0)
+        prefix = source.read(size)
+        source.seek(position)
+        return prefix
+    if not isinstance(source, (str, os.PathLike)):
+        # Such as the Message objects extract_msg returns for embedded messages
+        return b''
+    with open(source, 'rb') as f:
+        return f.read(size)
+
+
+def classify_ole(source):
+    """Tells Word documents and Outlook messages apart by the streams of an OLE compound file."""
+    import olefile
+
+    try:
+        data = read_file_data(source)
+        with olefile.OleFileIO(data) as ole:
+            streams = {entry[0] for entry in ole.listdir(streams=True, storages=True)}
+    except Exception:
+        return None
+    if 'WordDocument' in streams:
+        return DOC
+    if any(name.startswith('__substg1.0_') for name in streams):
+        return MSG
+    return None
+
+
+def detect_mime(source, file_name=''):
+    """Detects the MIME type of a file from its magic bytes, using the extension only to break ties.
+
+    The extension never overrides what the content says; it only narrows generic container types,
+    such as zip to DOCX or XLSX, or plain text to CSV.
+    """
+    prefix = read_prefix(source)
+    if not prefix:
+        return None
+    # Magic handles are not thread-safe, so each thread keeps its own
+    if not hasattr(_magic, 'detector'):
+        _magic.detector = magic.Magic(mime=True)
+    detected = _magic.detector.from_buffer(prefix)
+    detected = MIME_ALIASES.get(detected, detected)
+    if detected.startswith('text/') and detected not in EXTRACTORS:
+        detected = TXT
+
+    candidates = AMBIGUOUS_TYPES.get(detected)
+    if candidates is None:
+        return detected
+    by_extension = EXTENSION_TYPES.get(get_filetype(file_name))
+    if by_extension in candidates:
+        return by_extension
+    if detected == 'application/x-ole-storage':
+        return classify_ole(source)
+    return detected if detected in EXTRACTORS else None
+
+
+class Extractor:
+    """An extractor callable, the input it takes and whether it is CPU-bound enough for a worker process.
+
+    takes is 'path' for extractors that read from the filesystem, 'bytes' for in-memory data
+    and 'source' for either.
+    empty_content is reported in place of an empty result. normalized marks extractors that
+    already return normalized text, so it is not normalized a second time.
+    """
+
+    def __init__(self, label, function, takes='source', cpu_bound=False, empty_content='Invalid attachment',
+                 normalized=False):
+        self.label = label
+        self.function = function
+        self.takes = takes
+        self.cpu_bound = cpu_bound
+        self.empty_content = empty_content
+        self.normalized = normalized
+
+    def prepare(self, source):
+        """Converts a spooled file, bytes or path into the input the extractor expects."""
+        if self.takes == 'path':
+            return source_path(source)
+        if self.takes == 'bytes':
+            return read_file_data(source)
+        return source
+
+    def __call__(self, source):
+        result = self.function(self.prepare(source))
+        if self.normalized:
+            return result
+        with span('normalize'):
+            return normalize_result(result)
+
+
+EXTRACTORS = {
+    DOCX: Extractor('docx', extract_doc, cpu_bound=True),
+    DOC: Extractor('doc', extract_text_from_doc, takes='bytes'),
+    # Only the fitz work goes to the process pool, from inside the extractor; OCR and analysis wait on threads
+    PDF: Extractor('pdf', process_pdf_upload, takes='bytes', normalized=True),
+    TXT: Extractor('txt', extract_text_from_txt),
+    CSV: Extractor('csv', extract_text_from_csv, cpu_bound=True),
+    XLSX: Extractor('xlsx', extract_text_from_xlsx, cpu_bound=True),
+    HTML: Extractor('html', extract_text_from_html),
+    JPEG: Extractor('image', process_image_jpg, empty_content='Poor quality image or invalid attachment'),
+    PNG: Extractor('image', process_image_jpg, empty_content='Poor quality image or invalid attachment'),
+}
+
+
+def get_extractor(mime_type):
+    """Returns the extractor registered for a MIME type, or None when it is not supported."""
+    return EXTRACTORS.get(mime_type)
@@ -0,0 +1,98 @@
+from urllib.parse import unquote
+
+# Elements whose text a mail client never shows
+HIDDEN_ELEMENTS = {'script', 'style', 'template'}
+# Attributes that embed an inline image; marketing mail also uses background on tables and cells
+IMAGE_ATTRIBUTES = ('src', 'background')
+CID_SCHEME = 'cid:'
+
+
+def clean_url(url):
+    """Cleans a URL by removing trailing unwanted characters such as > or ] if they exist."""
+    return url.rstrip('>').rstrip(']')
+
+
+class HtmlContent:
+    """What one pass over an HTML document yields: its visible text, anchor links and inline cid: images."""
+
+    def __init__(self, text='', links=None, cid_refs=None):
+        self.text = text
+        self.links = links if links is not None else []
+        self.cid_refs = cid_refs if cid_refs is not None else []
+
+
+class HtmlCollector:
+    """lxml parser target that gathers text, links and cid: references as the parser emits events.
+
+    No tree is built. Text between two tags arrives in one or more data calls and is flushed as one
+    string at the next tag, so separator and strip work on the same strings BeautifulSoup yields.
+    """
+
+    def __init__(self, separator, strip):
+        self.separator = separator
+        self.strip = strip
+        self.strings = []
+        self.pending = []
+        self.hidden_depth = 0
+        self.links = []
+        self.cid_refs = []
+
+    def flush(self):
+        if not self.pending:
+            return
+        string = ''.join(self.pending)
+        self.pending = []
+        if self.strip:
+            string = string.strip()
+        if string:
+            self.strings.append(string)
+
+    def start(self, tag, attrib):
+        self.flush()
+        if tag in HIDDEN_ELEMENTS:
+            self.hidden_depth += 1
+        if tag == 'a' and 'href' in attrib:
+            self.links.append(clean_url(attrib['href']))
+        for name in IMAGE_ATTRIBUTES:
+            value = attrib.get(name)
+            if value and value[:4].lower() == CID_SCHEME:
+                self.cid_refs.append(unquote(value[4:].strip()))
+
+    def end(self, tag):
+        self.flush()
+        if tag in HIDDEN_ELEMENTS and self.hidden_depth:
+            self.hidden_depth -= 1
+
+    def data(self, data):
+        if not self.hidden_depth:
+            self.pending.append(data)
+
+    def comment(self, text):
+        # Comments are dropped, but still split the text around them like a tag does
+        self.flush()
+
+    def close(self):
+        self.flush()
+        return HtmlContent(self.separator.join(self.strings), self.links, self.cid_refs)
+
+
+def parse_html(html, separator='', strip=False):
+    """Walks an HTML document once with libxml2 and returns its HtmlContent.
+
+    Text strings are joined with separator, and stripped first when strip is set. html is a str;
+    callers decode bytes with text_encoding.decode_html so that the charset is chosen in one place.
+    """
+    from lxml import etree
+
+    if not html or not html.strip():
+        return HtmlContent()
+    collector = HtmlCollector(separator, strip)
+    # huge_tree lifts libxml2's nesting limit, which layout tables in marketing mail can exceed
+    parser = etree.HTMLParser(target=collector, huge_tree=True)
+    parser.feed(html)
+    return parser.close()
+
+
+def extract_visible_text_from_html(html):
+    """Returns the visible text of an email body, one stripped string per line."""
+    return parse_html(html, separator='\n', strip=True).text
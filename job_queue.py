@@ -0,0 +1,220 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+# Queue location and retry policy. SQLite in WAL mode needs the shared memory and file locks of a
+# local disk, so the API and every worker draining the queue must run on one host and point at the
+# same local directory, never at a network share
+job_queue_dir = os.getenv('JOB_QUEUE_DIR', 'jobs')
+job_visibility_timeout = float(os.getenv('JOB_VISIBILITY_TIMEOUT', 300))
+job_max_attempts = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+job_retry_delay = float(os.getenv('JOB_RETRY_DELAY', 10))
+job_result_ttl = float(os.getenv('JOB_RESULT_TTL', 7 * 24 * 3600))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class Job:
+    """A claimed job as seen by the worker running it."""
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.filename = row['filename']
+        self.payload_path = row['payload_path']
+        self.attempts = row['attempts']
+        self.max_attempts = row['max_attempts']
+        self.lease_token = row['lease_token']
+
+
+class JobQueue:
+    """Durable job queue in SQLite with payload files next to it, shared by the processes of one host.
+
+    A claimed job is leased to one worker for the visibility timeout. Workers extend the
+    lease while they run, and a job whose lease runs out is handed to the next worker.
+    Failed attempts are retried after a delay until max_attempts is reached.
+    """
+
+    def __init__(self, directory=None, visibility_timeout=None, max_attempts=None, retry_delay=None):
+        self.directory = job_queue_dir if directory is None else directory
+        self.visibility_timeout = job_visibility_timeout if visibility_timeout is None else visibility_timeout
+        self.max_attempts = job_max_attempts if max_attempts is None else max_attempts
+        self.retry_delay = job_retry_delay if retry_delay is None else retry_delay
+        self.payload_directory = os.path.join(self.directory, 'payloads')
+        os.makedirs(self.payload_directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode, transactions are opened explicitly so claims can lock the database
+        self._connection = sqlite3.connect(
+            os.path.join(self.directory, 'queue.sqlite3'), check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._connection.row_factory = sqlite3.Row
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, filename TEXT NOT NULL, payload_path TEXT, status TEXT NOT NULL, '
+                'attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, '
+                'available_at REAL NOT NULL, lease_token TEXT, lease_expires REAL, '
+                'result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS jobs_status_available ON jobs (status, available_at)')
+
+    def _transaction(self, statements):
+        """Runs statements(connection) inside an immediate transaction and returns its result."""
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self._connection)
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+            return result
+
+    def enqueue(self, filename, stream):
+        """Copies the upload into the payload directory and queues a job for it, returning the job id."""
+        job_id = uuid.uuid4().hex
+        payload_path = os.path.join(self.payload_directory, job_id)
+        stream.seek(0)
+        with open(payload_path, 'wb') as payload:
+            shutil.copyfileobj(stream, payload)
+        now = time.time()
+        try:
+            self._transaction(lambda connection: connection.execute(
+                'INSERT INTO jobs (id, filename, payload_path, status, max_attempts, available_at, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, filename, payload_path, QUEUED, self.max_attempts, now, now, now)
+            ))
+        except Exception:
+            os.remove(payload_path)
+            raise
+        return job_id
+
+    def claim(self):
+        """Leases the oldest runnable job to the caller, or returns None if there is none.
+
+        Queued jobs and running jobs whose lease expired are both runnable.
+        """
+        def claim_next(connection):
+            now = time.time()
+            row = connection.execute(
+                'SELECT id FROM jobs WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?) '
+                'ORDER BY available_at LIMIT 1',
+                (QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_token = ?, lease_expires = ?, updated_at = ? '
+                'WHERE id = ?',
+                (RUNNING, uuid.uuid4().hex, now + self.visibility_timeout, now, row['id'])
+            )
+            return connection.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone()
+
+        while True:
+            row = self._transaction(claim_next)
+            if row is None:
+                return None
+            if row['attempts'] <= row['max_attempts']:
+                return Job(row)
+            # The lease of the final attempt ran out, most likely because its worker died
+            self._finish(row['id'], row['lease_token'], FAILED, error='Job lease expired on the final attempt')
+
+    def extend_lease(self, job):
+        """Pushes the lease of a running job forward; returns False if the job was taken over."""
+        now = time.time()
+        cursor = self._transaction(lambda connection: connection.execute(
+            'UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?',
+            (now + self.visibility_timeout, now, job.id, job.lease_token, RUNNING)
+        ))
+        return cursor.rowcount == 1
+
+    def complete(self, job, result):
+        """Stores the result of a job and removes its payload."""
+        return self._finish(job.id, job.lease_token, SUCCEEDED, result=result)
+
+    def fail(self, job, error, retry=True):
+        """Schedules another attempt after the retry delay, or marks the job failed after the last one.
+
+        Without retry the job is marked failed at once, for errors another attempt would repeat.
+        """
+        if not retry or job.attempts >= job.max_attempts:
+            return self._finish(job.id, job.lease_token, FAILED, error=error)
+        now = time.time()
+        # Later attempts wait longer so a struggling backend gets room to recover
+        available_at = now + self.retry_delay * 2 ** (job.attempts - 1)
+        cursor = self._transaction(lambda connection: connection.execute(
+            'UPDATE jobs SET status = ?, available_at = ?, lease_token = NULL, lease_expires = NULL, error = ?, '
+            'updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?',
+            (QUEUED, available_at, error, now, job.id, job.lease_token, RUNNING)
+        ))
+        return cursor.rowcount == 1
+
+    def _finish(self, job_id, lease_token, status, result=None, error=None):
+        now = time.time()
+
+        def finish(connection):
+            row = connection.execute('SELECT payload_path FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            cursor = connection.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, payload_path = NULL, lease_token = NULL, '
+                'lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?',
+                (status, json.dumps(result, default=str) if result is not None else None, error, now, job_id, lease_token, RUNNING)
+            )
+            return cursor.rowcount == 1, row['payload_path'] if row else None
+
+        # A worker whose lease was taken over must not overwrite the new attempt
+        finished, payload_path = self._transaction(finish)
+        if finished and payload_path:
+            try:
+                os.remove(payload_path)
+            except FileNotFoundError:
+                pass
+        return finished
+
+    def get(self, job_id):
+        """Returns the public view of a job, or None if it does not exist."""
+        with self._lock:
+            row = self._connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            'id': row['id'],
+            'filename': row['filename'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error'] is not None:
+            job['error'] = row['error']
+        return job
+
+    def purge(self, max_age=None):
+        """Deletes finished jobs older than max_age seconds and returns how many were removed."""
+        max_age = job_result_ttl if max_age is None else max_age
+        cursor = self._transaction(lambda connection: connection.execute(
+            'DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?',
+            (SUCCEEDED, FAILED, time.time() - max_age)
+        ))
+        return cursor.rowcount
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Returns the process-wide job queue, opening it on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
@@ -0,0 +1,128 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import traceback
+from job_queue import JobQueue
+from warmup import warm_up
+from workspace import Workspace
+
+# Worker processes per host, how often an idle worker polls, and how often expired results are purged
+job_worker_processes = int(os.getenv('JOB_WORKER_PROCESSES', 2))
+job_poll_interval = float(os.getenv('JOB_POLL_INTERVAL', 1))
+job_purge_interval = float(os.getenv('JOB_PURGE_INTERVAL', 3600))
+
+
+def keep_lease(queue, job, stop):
+    """Extends the lease of a running job until stop is set or the job is taken over."""
+    interval = max(queue.visibility_timeout / 3, 0.1)
+    while not stop.wait(interval):
+        if not queue.extend_lease(job):
+            print(f"Lost the lease on job {job.id}")
+            return
+
+
+def extraction_errors(result):
+    """Collects the failures extractors reported under "errors" anywhere in a result, attachments included."""
+    if isinstance(result, dict):
+        errors = list(result.get('errors') or [])
+        for key, value in result.items():
+            if key != 'errors':
+                errors += extraction_errors(value)
+        return errors
+    if isinstance(result, list):
+        return [error for value in result for error in extraction_errors(value)]
+    return []
+
+
+def run_job(queue, job):
+    """Extracts the payload of a claimed job and records the result or the failure."""
+    # Imported here so the Flask app and the extractors load inside the worker process
+    from app import process_upload
+
+    print(f"Running job {job.id} ({job.filename}), attempt {job.attempts} of {job.max_attempts}")
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=keep_lease, args=(queue, job, stop), daemon=True)
+    heartbeat.start()
+    try:
+        with Workspace() as workspace:
+            upload = workspace.spool(job.filename)
+            with open(job.payload_path, 'rb') as payload:
+                shutil.copyfileobj(payload, upload)
+            result = process_upload(job.filename, upload, workspace)
+    except Exception as e:
+        traceback.print_exc()
+        stop.set()
+        queue.fail(job, f"{type(e).__name__}: {e}")
+        return
+    stop.set()
+    if 'error' in result:
+        # The upload was rejected, such as for an unsupported file type, so a retry would fail the same way
+        queue.fail(job, result['error'], retry=False)
+        print(f"Job {job.id} failed: {result['error']}")
+        return
+    content = result.get('result')
+    if not content:
+        queue.fail(job, 'The extraction returned no content')
+        print(f"Job {job.id} returned no content")
+        return
+    errors = extraction_errors(content)
+    if errors and job.attempts < job.max_attempts:
+        # Azure outages come back as partial results, so they get another attempt after the backoff;
+        # the last attempt keeps whatever it extracted
+        queue.fail(job, '; '.join(errors))
+        print(f"Job {job.id} is incomplete and will be retried: {'; '.join(errors)}")
+        return
+    queue.complete(job, result)
+    print(f"Finished job {job.id}")
+
+
+def run_worker(directory=None, poll_interval=None, max_jobs=None):
+    """Drains the queue in the current process, sleeping while it is empty."""
+    queue = JobQueue(directory)
+    # Workers are long-lived, so they pay the import cost once up front instead of on their first job
+    warm_up()
+    poll_interval = job_poll_interval if poll_interval is None else poll_interval
+    jobs_run = 0
+    last_purge = 0
+    while max_jobs is None or jobs_run < max_jobs:
+        if time.time() - last_purge > job_purge_interval:
+            queue.purge()
+            last_purge = time.time()
+        job = queue.claim()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(queue, job)
+        jobs_run += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs worker processes that drain the extraction job queue.')
+    parser.add_argument('--processes', type=int, default=job_worker_processes, help='number of worker processes')
+    parser.add_argument('--queue-dir', default=None, help='local queue directory shared with the API on this host (JOB_QUEUE_DIR)')
+    parser.add_argument('--poll-interval', type=float, default=None, help='seconds to wait when the queue is empty')
+    args = parser.parse_args()
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(args.queue_dir, args.poll_interval), name=f'job-worker-{i}')
+        for i in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"Started {len(workers)} job workers")
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        # Jobs interrupted here are picked up again once their lease runs out
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit
+from extraction_cache import is_cacheable
+from extract_text_wordpdf import PDF_EXTRACTOR_VERSION
+
+# Location and size of the hyperlink cache; an empty path disables it
+link_cache_path = os.getenv('LINK_CACHE_PATH', os.path.join('cache', 'links.sqlite3'))
+link_cache_max_bytes = int(os.getenv('LINK_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+# Upper bound on how long a response without explicit freshness is trusted from its Last-Modified date
+link_cache_heuristic_max_seconds = float(os.getenv('LINK_CACHE_HEURISTIC_MAX_SECONDS', 24 * 60 * 60))
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+CACHE_CONTROL_DIRECTIVE = re.compile(r'\s*([A-Za-z-]+)\s*(?:=\s*"?([^",]*)"?)?\s*(?:,|$)')
+# RFC 9111 4.2.2: a tenth of the time since the last change is a reasonable heuristic lifetime
+HEURISTIC_FRACTION = 0.1
+# Bump whenever extract_link_content changes the text it returns; PDF extractor bumps are picked up on their own
+LINK_EXTRACTOR_VERSION = f'1.pdf{PDF_EXTRACTOR_VERSION}'
+
+
+def normalize_url(url):
+    """Returns the URL part of a cache key: scheme and host lowercased, default port and fragment dropped."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+def parse_cache_control(value):
+    """Returns the directives of a Cache-Control header as a dict of lowercased names to values."""
+    directives = {}
+    for name, argument in CACHE_CONTROL_DIRECTIVE.findall(value or ''):
+        directives[name.lower()] = argument
+    return directives
+
+
+def parse_http_date(value):
+    """Returns an HTTP date as a timestamp, or None when it is missing or malformed."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers, now):
+    """Returns for how many seconds from now a response stays fresh, or None when it must not be stored."""
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0
+    try:
+        age = max(0, int(headers.get('Age', 0)))
+    except ValueError:
+        age = 0
+    if directives.get('max-age', '').isdigit():
+        return max(0, int(directives['max-age']) - age)
+    date = parse_http_date(headers.get('Date')) or now
+    expires = parse_http_date(headers.get('Expires'))
+    if headers.get('Expires') is not None:
+        # An invalid Expires means already expired
+        return max(0, expires - date) if expires is not None else 0
+    last_modified = parse_http_date(headers.get('Last-Modified'))
+    if last_modified is not None and last_modified < date:
+        return min((date - last_modified) * HEURISTIC_FRACTION, link_cache_heuristic_max_seconds)
+    return 0
+
+
+class CachedLink:
+    """The extracted text of a hyperlink and what is needed to tell whether it is still current."""
+
+    def __init__(self, url, content, etag=None, last_modified=None, fresh_until=0, must_revalidate=False):
+        self.url = url
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+        self.must_revalidate = must_revalidate
+
+    def is_fresh(self, now=None):
+        return (time.time() if now is None else now) < self.fresh_until
+
+    def validators(self):
+        """Returns the headers of a conditional request for this link."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class LinkCache:
+    """SQLite store of extracted hyperlink text keyed by extractor version and normalized URL.
+
+    Entries follow the response's Cache-Control, Expires and validators, and the least recently
+    used ones are evicted above max_bytes.
+    """
+
+    def __init__(self, path=None, max_bytes=None, extractor_version=LINK_EXTRACTOR_VERSION):
+        self.path = link_cache_path if path is None else path
+        self.max_bytes = link_cache_max_bytes if max_bytes is None else max_bytes
+        self.extractor_version = extractor_version
+        self._counters = {'fresh_hits': 0, 'revalidated': 0, 'stale_served': 0, 'misses': 0, 'stores': 0}
+        self._lock = threading.Lock()
+        self._connection = None
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS links ('
+                'url TEXT PRIMARY KEY, content TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+                'fresh_until REAL NOT NULL, must_revalidate INTEGER NOT NULL, '
+                'size INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS links_last_access ON links (last_access)')
+
+    def key(self, url):
+        """Returns the row key of a URL; text from older extractors is left to be evicted."""
+        return f'{self.extractor_version}:{normalize_url(url)}'
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        """Returns the hit, revalidation and miss counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def get(self, url):
+        """Returns the cached link for a URL, fresh or not, or None."""
+        if self._connection is None:
+            return None
+        key = self.key(url)
+        try:
+            with self._lock, self._connection:
+                row = self._connection.execute(
+                    'SELECT content, etag, last_modified, fresh_until, must_revalidate FROM links WHERE url = ?', (key,)
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute('UPDATE links SET last_access = ? WHERE url = ?', (time.time(), key))
+        except sqlite3.Error as e:
+            print(f"Error reading link cache: {e}")
+            return None
+        if row is None:
+            self.count('misses')
+            return None
+        content, etag, last_modified, fresh_until, must_revalidate = row
+        cached_link = CachedLink(url, json.loads(content), etag, last_modified, fresh_until, bool(must_revalidate))
+        if cached_link.is_fresh():
+            self.count('fresh_hits')
+        return cached_link
+
+    def put(self, link, content):
+        """Stores the text extracted from a full 200 response, when its headers allow it."""
+        if self._connection is None or link.status != 200 or not is_cacheable(content):
+            return
+        now = time.time()
+        lifetime = freshness_lifetime(link.headers, now)
+        etag = link.headers.get('ETag')
+        last_modified = link.headers.get('Last-Modified')
+        # A response that is stale at once and cannot be revalidated would never be used
+        if lifetime is None or (lifetime == 0 and not etag and not last_modified):
+            return
+        must_revalidate = 'must-revalidate' in parse_cache_control(link.headers.get('Cache-Control'))
+        value = json.dumps(content)
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO links (url, content, etag, last_modified, fresh_until, must_revalidate, '
+                    'size, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (self.key(link.url), value, etag, last_modified, now + lifetime, must_revalidate, size, now)
+                )
+                self.evict()
+                self._counters['stores'] += 1
+        except sqlite3.Error as e:
+            print(f"Error writing link cache: {e}")
+
+    def refresh(self, cached_link, link):
+        """Extends a cached link after a 304 Not Modified, taking any updated validators from the response."""
+        if self._connection is None:
+            return
+        now = time.time()
+        lifetime = freshness_lifetime(link.headers, now) or 0
+        cached_link.etag = link.headers.get('ETag') or cached_link.etag
+        cached_link.last_modified = link.headers.get('Last-Modified') or cached_link.last_modified
+        cached_link.fresh_until = now + lifetime
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    'UPDATE links SET etag = ?, last_modified = ?, fresh_until = ?, last_access = ? WHERE url = ?',
+                    (cached_link.etag, cached_link.last_modified, cached_link.fresh_until, now,
+                     self.key(cached_link.url))
+                )
+                self._counters['revalidated'] += 1
+        except sqlite3.Error as e:
+            print(f"Error writing link cache: {e}")
+
+    def evict(self):
+        """Drops the least recently used links until the store fits; called with the lock held."""
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM links').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        evicted_urls = []
+        for evicted_url, evicted_size in self._connection.execute('SELECT url, size FROM links ORDER BY last_access'):
+            evicted_urls.append((evicted_url,))
+            excess -= evicted_size
+            if excess <= 0:
+                break
+        self._connection.executemany('DELETE FROM links WHERE url = ?', evicted_urls)
+
+
+_link_cache = None
+_link_cache_lock = threading.Lock()
+
+
+def get_link_cache():
+    """Returns the process-wide link cache, disabled rather than failing when its file cannot be opened."""
+    global _link_cache
+    with _link_cache_lock:
+        if _link_cache is None:
+            try:
+                _link_cache = LinkCache()
+            except sqlite3.Error as e:
+                print(f"Link cache unavailable: {e}")
+                _link_cache = LinkCache(path='')
+        return _link_cache
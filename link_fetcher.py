@@ -0,0 +1,166 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from metrics import span, submit
+from text_encoding import decode_bytes
+
+# Concurrency of hyperlink downloads, in total and per host, and the size and time one download may take
+link_fetch_workers = int(os.getenv('LINK_FETCH_WORKERS', 8))
+link_fetch_per_host = int(os.getenv('LINK_FETCH_PER_HOST', 2))
+link_fetch_max_bytes = int(os.getenv('LINK_FETCH_MAX_BYTES', 20 * 1024 * 1024))
+link_fetch_connect_timeout = float(os.getenv('LINK_FETCH_CONNECT_TIMEOUT', 5))
+link_fetch_read_timeout = float(os.getenv('LINK_FETCH_READ_TIMEOUT', 15))
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 512
+
+# Formats that are useless when cut off at the byte limit
+BINARY_KINDS = {'pdf', 'docx', 'doc'}
+
+
+class FetchedLink:
+    """Result of downloading a single hyperlink."""
+
+    def __init__(self, url, kind=None, content=b'', truncated=False, status=None, error=None, headers=None):
+        self.url = url
+        self.kind = kind
+        self.content = content
+        self.truncated = truncated
+        self.status = status
+        self.error = error
+        self.headers = headers if headers is not None else {}
+
+    @property
+    def ok(self):
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    @property
+    def not_modified(self):
+        """The server confirmed a conditional request: the cached copy is still current."""
+        return self.error is None and self.status == 304
+
+    def text(self):
+        return decode_bytes(self.content)
+
+
+def sniff_kind(prefix, content_type=None, url=None):
+    """Detects the document type from the first bytes, using the headers only for plain text."""
+    if prefix.startswith(b'%PDF'):
+        return 'pdf'
+    if prefix.startswith(b'PK\x03\x04'):
+        return 'docx'
+    if prefix.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        return 'doc'
+
+    head = prefix.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if head.startswith((b'<!doctype html', b'<html', b'<head', b'<body', b'<meta', b'<table', b'<div', b'<p>')):
+        return 'html'
+
+    if b'\x00' in prefix and not prefix.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return None
+
+    # Text bodies carry no reliable signature, so fall back to the declared type or extension
+    content_type = (content_type or '').lower()
+    path = urlsplit(url).path.lower() if url else ''
+    if 'csv' in content_type or path.endswith('.csv'):
+        return 'csv'
+    if 'html' in content_type:
+        return 'html'
+    if content_type.startswith('text/') or path.endswith('.txt'):
+        return 'txt'
+    return None
+
+
+def unique_urls(urls):
+    """Removes repeated URLs while keeping the order of first appearance."""
+    seen = set()
+    unique = []
+    for url in urls:
+        if url not in seen:
+            seen.add(url)
+            unique.append(url)
+    return unique
+
+
+class LinkFetcher:
+    """Downloads hyperlinks concurrently over a pooled session with per-host limits."""
+
+    def __init__(self, session=None, max_workers=None, per_host=None, max_bytes=None, timeout=None):
+        self.max_workers = max_workers or link_fetch_workers
+        self.per_host = per_host or link_fetch_per_host
+        self.max_bytes = max_bytes or link_fetch_max_bytes
+        self.timeout = timeout or (link_fetch_connect_timeout, link_fetch_read_timeout)
+        self.session = session or self.build_session()
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+
+    def build_session(self):
+        """Creates a session whose connection pool matches the fetch concurrency."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def host_limit(self, url):
+        """Returns the semaphore that bounds concurrent requests to the URL's host."""
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def fetch(self, url, headers=None):
+        """Streams a single URL up to the byte limit and sniffs its type; headers can make the request conditional."""
+        try:
+            with self.host_limit(url), span('link_fetch') as timing:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    chunks = []
+                    size = 0
+                    truncated = False
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if size + len(chunk) > self.max_bytes:
+                            chunks.append(chunk[:self.max_bytes - size])
+                            truncated = True
+                            break
+                        chunks.append(chunk)
+                        size += len(chunk)
+                    content = b''.join(chunks)
+                    kind = sniff_kind(content[:SNIFF_BYTES], response.headers.get('Content-Type'), url)
+                    if truncated and kind in BINARY_KINDS:
+                        print(f"Link {url} exceeds {self.max_bytes} bytes, skipping")
+                        kind = None
+                    timing.filetype = kind or 'other'
+                    return FetchedLink(url, kind, content, truncated, response.status_code, headers=response.headers)
+        except Exception as e:
+            print(f"Error fetching link {url}: {e}")
+            return FetchedLink(url, error=str(e))
+
+    def fetch_many(self, urls, headers=None):
+        """Fetches each distinct URL once and returns the results in first-seen order.
+
+        headers maps a URL to the extra request headers it is fetched with, such as cache validators.
+        """
+        urls = unique_urls(urls)
+        if not urls:
+            return []
+        headers = headers or {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)), thread_name_prefix='link') as pool:
+            futures = [submit(pool, self.fetch, url, headers.get(url)) for url in urls]
+            return [future.result() for future in futures]
+
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_link_fetcher():
+    """Returns the process-wide fetcher so every request shares one connection pool."""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = LinkFetcher()
+        return _default_fetcher
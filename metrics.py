@@ -0,0 +1,188 @@
+import bisect
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+# Set to 0 to turn the timing spans into no-ops
+metrics_enabled = os.getenv('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+# Upper bounds in seconds; Azure OCR and analysis waits run into minutes, text extraction into milliseconds
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# File type of the document being extracted, inherited by the spans nested inside its extraction
+_filetype = contextvars.ContextVar('metrics_filetype', default='other')
+# Spans of the current request, collected only when the caller asked for a timing breakdown
+_timing_collector = contextvars.ContextVar('metrics_timing_collector', default=None)
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with one series per combination of label values."""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Bucket counts, with the +Inf bucket last, then the sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        """Returns the histogram in the Prometheus text exposition format, with cumulative buckets."""
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, values in sorted(series.items()):
+            labels = ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {values[-1]}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+STAGE_SECONDS = Histogram(
+    'extraction_stage_seconds', 'Time spent in each stage of an upload, by stage and file type.',
+    ('stage', 'filetype'), STAGE_BUCKETS
+)
+
+
+class Span:
+    """Times one stage; the file type may be filled in before the span ends, once it has been detected.
+
+    A span given a file type also becomes the file type of the spans opened inside it.
+    """
+
+    __slots__ = ('stage', 'filetype', 'started', 'token')
+
+    def __init__(self, stage, filetype=None):
+        self.stage = stage
+        self.filetype = filetype
+        self.token = None
+
+    def __enter__(self):
+        if self.filetype is not None:
+            self.token = _filetype.set(self.filetype)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.started
+        if self.token is not None:
+            _filetype.reset(self.token)
+        record(self.stage, seconds, self.filetype)
+        return False
+
+
+class NullSpan:
+    """What span returns when metrics are disabled."""
+
+    __slots__ = ('filetype',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def span(stage, filetype=None):
+    """Returns a context manager that records how long its block took under stage.
+
+    Without a file type the span takes the one of the extraction it runs in.
+    """
+    if not metrics_enabled:
+        return NullSpan()
+    return Span(stage, filetype)
+
+
+def record(stage, seconds, filetype=None):
+    """Records a stage that was timed elsewhere, such as in a worker process."""
+    if filetype is None:
+        filetype = _filetype.get()
+    STAGE_SECONDS.observe(seconds, stage, filetype)
+    timing_collector = _timing_collector.get()
+    if timing_collector is not None:
+        timing_collector.spans.append((stage, filetype, seconds))
+
+
+def submit(pool, function, *args, **kwargs):
+    """Submits to a thread pool with the caller's context, so spans in the worker keep its file type and breakdown."""
+    return pool.submit(contextvars.copy_context().run, function, *args, **kwargs)
+
+
+class TimingCollector:
+    """The spans of one request, gathered from every thread that runs part of it."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+
+
+@contextlib.contextmanager
+def collecting_timings(enabled=True):
+    """Collects the spans recorded inside the block so timing_breakdown can report them."""
+    if not enabled:
+        yield
+        return
+    token = _timing_collector.set(TimingCollector())
+    try:
+        yield
+    finally:
+        _timing_collector.reset(token)
+
+
+def timing_breakdown():
+    """Sums the spans collected so far per stage, or returns None when nothing is being collected.
+
+    Stages running in parallel, such as two attachments, overlap, so the stage times may add up to
+    more than the total.
+    """
+    timing_collector = _timing_collector.get()
+    if timing_collector is None:
+        return None
+    stages = {}
+    for stage, filetype, seconds in list(timing_collector.spans):
+        entry = stages.setdefault(stage, {'count': 0, 'seconds': 0.0})
+        entry['count'] += 1
+        entry['seconds'] += seconds
+    for entry in stages.values():
+        entry['seconds'] = round(entry['seconds'], 4)
+    return {'total_seconds': round(time.perf_counter() - timing_collector.started, 4), 'stages': stages}
+
+
+def render_counters(name, documentation, label_name, counters):
+    """Renders a dict of running totals, such as the cache statistics, as one Prometheus counter."""
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} counter']
+    for label_value, value in sorted(counters.items()):
+        lines.append(f'{name}{{{label_name}="{escape_label(label_value)}"}} {value}')
+    return '\n'.join(lines)
+
+
+def render_gauge(name, documentation, value):
+    """Renders a single current value, such as a cache size, as a Prometheus gauge."""
+    return f'# HELP {name} {documentation}\n# TYPE {name} gauge\n{name} {value}'
+
+
+def render_metrics(extra=()):
+    """Returns the body of the /metrics endpoint."""
+    return '\n'.join((STAGE_SECONDS.render(),) + tuple(extra)) + '\n'
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from attachment_pool import extract_attachments
+from email_message import ParsedEmail
+from extract_emailbody import read_email
+from extractor_registry import filetype_label, get_filetype, EML, MSG
+from metrics import span, submit
+from text_normalizer import normalize_result, normalize_text
+
+# How deep messages may nest in one upload, how many bytes they may unpack to, and how many parse at once
+nested_max_depth = int(os.getenv('NESTED_MAX_DEPTH', 5))
+nested_max_bytes = int(os.getenv('NESTED_MAX_BYTES', 100 * 1024 * 1024))
+nested_message_workers = int(os.getenv('NESTED_MESSAGE_WORKERS', 4))
+
+NESTED_TYPES = {EML, MSG}
+
+
+class NestingBudget:
+    """Limits shared by all messages nested in one upload: depth, total payload bytes and duplicates.
+
+    Identical inner messages, such as the same forward quoted twice, are extracted once and share the result.
+    """
+
+    def __init__(self, max_depth=None, max_bytes=None):
+        self.max_depth = nested_max_depth if max_depth is None else max_depth
+        self.max_bytes = nested_max_bytes if max_bytes is None else max_bytes
+        self.used_bytes = 0
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, size):
+        """Takes size bytes from the budget, or returns False if they no longer fit."""
+        with self._lock:
+            if self.used_bytes + size > self.max_bytes:
+                return False
+            self.used_bytes += size
+            return True
+
+    def run_once(self, key, compute):
+        """Returns compute() for the first caller with key; later callers wait for and share that result."""
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        if owner:
+            try:
+                future.set_result(compute())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def spool_attachments(parsed_email, workspace):
+    """Spools the attachments of a parsed email into the workspace for the attachment extractors."""
+    attachments = []
+    with span('attachment_decode'):
+        for a in parsed_email.attachments:
+            print(f"\tSpooling attachment: {a.filename}")
+            spooled_file = workspace.spool(a.filename, a.data)
+            attachments.append({'filename': a.filename, 'file': spooled_file, 'message': a.message})
+    if attachments:
+        print('Regular attachments extracted')
+
+    return attachments
+
+
+def extract_email_message(parsed_email, workspace, budget, depth):
+    """Extracts the headers, body and attachments of an email at the given nesting depth."""
+    attachments = spool_attachments(parsed_email, workspace)
+    parsed_attachments = extract_attachments(attachments, budget, depth)
+
+    with span('email_body'):
+        email_details = read_email(parsed_email)
+    with span('normalize'):
+        email_details = normalize_result(email_details)
+    if 'Body' not in email_details or not email_details['Body'].strip():
+        email_details['Body'] = 'Unavailable'
+    email_details['Attachments'] = parsed_attachments
+    return email_details
+
+
+def message_key(mime_type, source):
+    """Returns the dedupe key and payload size of a nested message.
+
+    Messages embedded in an MSG file have no raw bytes, so they are keyed on their headers and body.
+    """
+    digest = getattr(source, 'sha256', None)
+    if digest is not None:
+        return f'{mime_type}:{digest}', source.size
+    if isinstance(source, (bytes, bytearray)):
+        return f'{mime_type}:{hashlib.sha256(source).hexdigest()}', len(source)
+    fingerprint = '\0'.join(str(getattr(source, name, '')) for name in ('subject', 'sender', 'to', 'date', 'body'))
+    return f'{mime_type}:{hashlib.sha256(fingerprint.encode("utf-8", "replace")).hexdigest()}', len(fingerprint)
+
+
+def extract_nested_message(file_name, source, mime_type, budget, depth, message=None):
+    """Extracts an embedded .eml or .msg message with all of its attachments, within the budget.
+
+    source is the spooled attachment, or the extract_msg Message of a message embedded in an MSG file.
+    """
+    result = {'filename': normalize_text(file_name), 'filetype': get_filetype(file_name)}
+    if depth > budget.max_depth:
+        print(f"Skipping nested message {file_name}: depth limit of {budget.max_depth} reached")
+        result['content'] = 'Nested message depth limit reached'
+        return result
+
+    key, size = message_key(mime_type, source)
+
+    def extract():
+        if not budget.reserve(size):
+            print(f"Skipping nested message {file_name}: nested size budget exhausted")
+            return 'Nested message size budget exceeded'
+        print(f"Extracting nested message at depth {depth}: {file_name}")
+        with span('extract', filetype_label(mime_type)):
+            if mime_type == EML:
+                if message is not None:
+                    parsed_email = message
+                else:
+                    with span('mime_parse'):
+                        parsed_email = ParsedEmail.load(source)
+                return extract_email_message(parsed_email, source.workspace, budget, depth)
+            from extractmsg import extract_text_from_msg
+            return extract_text_from_msg(source.to_path() if hasattr(source, 'to_path') else source, budget, depth)
+
+    try:
+        result['content'] = budget.run_once(key, extract) or 'Invalid attachment'
+    except Exception as e:
+        print(f"Error parsing nested message {file_name}: {e}")
+        result['content'] = 'Invalid attachment'
+    return result
+
+
+def extract_nested_messages(messages, budget, depth):
+    """Extracts sibling nested messages in parallel and returns the results in their original order.
+
+    messages holds (file_name, source, mime_type, message) tuples. Every level gets its own
+    short-lived threads, so a parent waiting on its children never starves the shared pools.
+    """
+    if len(messages) <= 1:
+        return [extract_nested_message(file_name, source, mime_type, budget, depth, message)
+                for file_name, source, mime_type, message in messages]
+    with ThreadPoolExecutor(max_workers=min(len(messages), nested_message_workers),
+                            thread_name_prefix='nested-message') as pool:
+        futures = [submit(pool, extract_nested_message, file_name, source, mime_type, budget, depth, message)
+                   for file_name, source, mime_type, message in messages]
+        return [future.result() for future in futures]
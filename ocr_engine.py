@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from metrics import span, submit
+
+# Read API calls in flight at once, the polling backoff, how long one page may take, and retries of a throttled submit
+ocr_max_in_flight = int(os.getenv('OCR_MAX_IN_FLIGHT', 8))
+ocr_poll_initial = float(os.getenv('OCR_POLL_INITIAL', 0.25))
+ocr_poll_max = float(os.getenv('OCR_POLL_MAX', 4))
+ocr_timeout = float(os.getenv('OCR_TIMEOUT', 180))
+ocr_submit_retries = int(os.getenv('OCR_SUBMIT_RETRIES', 3))
+
+
+def load_image(image):
+    """Returns the bytes of an image given as bytes, a file-like object or a path."""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    if hasattr(image, 'getvalue'):
+        return image.getvalue()
+    if hasattr(image, 'read'):
+        return image.read()
+    with open(image, 'rb') as image_stream:
+        return image_stream.read()
+
+
+def retry_after_seconds(response):
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def submit_read(client, image_data, **read_options):
+    """Starts a Read operation, backing off on throttling, and returns its operation id."""
+    delay = ocr_poll_initial
+    for attempt in range(ocr_submit_retries + 1):
+        try:
+            ocr_result = client.read_in_stream(BytesIO(image_data), raw=True, **read_options)
+            operation_location = ocr_result.headers["Operation-Location"]
+            return operation_location.split("/")[-1]
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            if getattr(response, 'status_code', None) != 429 or attempt == ocr_submit_retries:
+                raise
+            time.sleep(retry_after_seconds(response) or delay)
+            delay = min(delay * 2, ocr_poll_max)
+
+
+def wait_for_read_result(client, operation_id):
+    """Polls a Read operation with exponential backoff, honouring Retry-After from the service."""
+    deadline = time.monotonic() + ocr_timeout
+    delay = ocr_poll_initial
+    while True:
+        raw_result = client.get_read_result(operation_id, raw=True)
+        result = raw_result.output
+        if result.status not in ['notStarted', 'running']:
+            return result
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"OCR operation {operation_id} did not finish within {ocr_timeout} seconds")
+        retry_after = retry_after_seconds(raw_result.response)
+        time.sleep(min(max(delay, retry_after or 0), remaining))
+        delay = min(delay * 2, ocr_poll_max)
+
+
+class OcrError(Exception):
+    """Raised when the Read API could not extract the text of an image."""
+
+
+def read_text(client, image, **read_options):
+    """Extracts the text of one image with the Read API, raising OcrError when it cannot be read."""
+    from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
+    try:
+        with span('ocr_submit'):
+            operation_id = submit_read(client, load_image(image), **read_options)
+        with span('ocr_wait'):
+            result = wait_for_read_result(client, operation_id)
+    except Exception as e:
+        raise OcrError(f"Image is invalid for text extraction: {e}") from e
+
+    if result.status != OperationStatusCodes.succeeded:
+        raise OcrError("OCR failed: insufficient image quality.")
+    text = ""
+    for read_result in result.analyze_result.read_results:
+        for line in read_result.lines:
+            text += line.text + " "
+    return text
+
+
+def release_image(image, in_flight):
+    """Frees the OCR slot, and the render budget of lazily rendered pages."""
+    release = getattr(image, 'release', None)
+    if release is not None:
+        release()
+    in_flight.release()
+
+
+def read_texts(client, images, max_in_flight=None, **read_options):
+    """OCRs many images concurrently and returns their texts in input order, None for those that failed.
+
+    images may be a lazy iterable; at most max_in_flight images are pulled and in flight at once.
+    """
+    max_in_flight = max_in_flight or ocr_max_in_flight
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='ocr') as pool:
+        image_iterator = iter(images)
+        while True:
+            # Take a slot before producing the next image so lazily rendered pages stay bounded too
+            in_flight.acquire()
+            try:
+                image = next(image_iterator)
+            except StopIteration:
+                in_flight.release()
+                break
+            future = submit(pool, read_text, client, image, **read_options)
+            future.add_done_callback(lambda _, image=image: release_image(image, in_flight))
+            futures.append(future)
+    texts = []
+    for future in futures:
+        try:
+            texts.append(future.result())
+        except OcrError as e:
+            print(e)
+            texts.append(None)
+    return texts
@@ -0,0 +1,164 @@
+import math
+import os
+import threading
+import fitz
+from text_normalizer import TextNormalizer
+
+# Render limits for OCR; the defaults stay well inside the Read API's 10000px side limit
+ocr_render_max_dpi = int(os.getenv('OCR_RENDER_MAX_DPI', 300))
+ocr_render_max_side = int(os.getenv('OCR_RENDER_MAX_SIDE', 4200))
+ocr_render_max_pixels = int(os.getenv('OCR_RENDER_MAX_PIXELS', 16 * 1000 * 1000))
+ocr_render_budget_bytes = int(os.getenv('OCR_RENDER_BUDGET_BYTES', 256 * 1024 * 1024))
+
+
+def open_pdf(pdf_data):
+    """Opens a PDF from its bytes, a path or a spooled upload, reading large spilled uploads from disk."""
+    if isinstance(pdf_data, (str, os.PathLike)):
+        return fitz.open(pdf_data, filetype="pdf")
+    if getattr(pdf_data, 'in_memory', None) is False:
+        return fitz.open(pdf_data.to_path(), filetype="pdf")
+    if hasattr(pdf_data, 'getvalue'):
+        pdf_data = pdf_data.getvalue()
+    return fitz.open(stream=pdf_data, filetype="pdf")
+
+
+def process_source(pdf_data):
+    """Returns what a worker process opens the PDF from: the path of a spilled upload, else the bytes."""
+    if getattr(pdf_data, 'in_memory', None) is False:
+        return pdf_data.to_path()
+    if hasattr(pdf_data, 'getvalue'):
+        return pdf_data.getvalue()
+    return pdf_data
+
+
+def extract_page_texts(doc):
+    """Returns the text of every page, or None for pages without a text layer."""
+    page_texts = []
+    for page in doc:
+        # The former "layout" option is not a PyMuPDF format and always fell back to plain text
+        text = page.get_text()
+        page_texts.append(text if text.strip() else None)
+    return page_texts
+
+
+def choose_dpi(page):
+    """Picks the render DPI for a page so the image stays within the OCR pixel limits."""
+    width_in = page.rect.width / 72
+    height_in = page.rect.height / 72
+    dpi = ocr_render_max_dpi
+    if max(width_in, height_in) > 0:
+        dpi = min(dpi, ocr_render_max_side / max(width_in, height_in))
+    if width_in * height_in > 0:
+        dpi = min(dpi, math.sqrt(ocr_render_max_pixels / (width_in * height_in)))
+    return max(int(dpi), 1)
+
+
+def render_size(page):
+    """Returns the bytes of the raw RGB pixmap of a page at its render DPI, the peak footprint of rendering it."""
+    zoom = choose_dpi(page) / 72
+    return max(1, int(page.rect.width * zoom) * int(page.rect.height * zoom) * 3)
+
+
+class MemoryBudget:
+    """Caps the bytes held by rendered pages that are waiting for or going through OCR."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size):
+        with self._condition:
+            # A page larger than the whole budget may still go through on its own
+            while self.used and self.used + size > self.max_bytes:
+                self._condition.wait()
+            self.used += size
+
+    def release(self, size):
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+render_budget = MemoryBudget(ocr_render_budget_bytes)
+
+
+class RenderedPage:
+    """An encoded page image that returns its share of the render budget once OCR is done."""
+
+    def __init__(self, page_num, data, reserved):
+        self.page_num = page_num
+        self.data = data
+        self._reserved = reserved
+
+    def getvalue(self):
+        return self.data
+
+    def release(self):
+        if self._reserved:
+            render_budget.release(self._reserved)
+            self._reserved = 0
+            self.data = None
+
+
+def read_pdf_layout(source):
+    """Worker task: returns the text of every page, None for image-only pages, with the render size of those."""
+    with open_pdf(source) as doc:
+        page_texts = extract_page_texts(doc)
+        render_sizes = {page_num: render_size(doc.load_page(page_num))
+                        for page_num, text in enumerate(page_texts) if text is None}
+    return page_texts, render_sizes
+
+
+def render_pdf_page(source, page_num):
+    """Worker task: renders one page to PNG bytes at the DPI chosen for its size."""
+    with open_pdf(source) as doc:
+        page = doc.load_page(page_num)
+        pix = page.get_pixmap(dpi=choose_dpi(page))
+        return pix.tobytes("png")
+
+
+def render_pages(source, page_numbers, render_sizes):
+    """Lazily renders pages to PNG bytes in a worker process, waiting for budget before each page."""
+    from attachment_pool import run_in_process
+    for page_num in page_numbers:
+        reserved = render_sizes[page_num]
+        render_budget.acquire(reserved)
+        try:
+            data = run_in_process(render_pdf_page, source, page_num)
+        except Exception:
+            render_budget.release(reserved)
+            raise
+        yield RenderedPage(page_num, data, reserved)
+
+
+def extract_pdf_pages_text(pdf_data, ocr_images):
+    """Keeps the text layer of typed pages and OCRs only the image-only pages.
+
+    fitz runs in the attachment process pool, while ocr_images runs in the calling thread. It takes
+    an iterable of rendered pages and returns their texts in the same order, None for a page it
+    could not read. The pages are normalized as they are joined, so the raw text of the whole
+    document is never built. Returns the text and the numbers of the unread pages, counted from 1.
+    """
+    from attachment_pool import run_in_process
+    source = process_source(pdf_data)
+    page_texts, render_sizes = run_in_process(read_pdf_layout, source)
+    scanned_pages = [page_num for page_num, text in enumerate(page_texts) if text is None]
+
+    if not scanned_pages:
+        print("The PDF is text-based. Extracting text...")
+    elif len(scanned_pages) == len(page_texts):
+        print("The PDF contains scanned images. Performing OCR...")
+    else:
+        print(f"The PDF mixes text and scanned pages. Performing OCR on {len(scanned_pages)} of {len(page_texts)} pages...")
+
+    unread_pages = []
+    if scanned_pages:
+        # Pages are rendered one at a time as OCR slots free up
+        for page_num, text in zip(scanned_pages, ocr_images(render_pages(source, scanned_pages, render_sizes))):
+            if text is None:
+                unread_pages.append(page_num + 1)
+            page_texts[page_num] = text
+
+    # Typed and OCR'd pages are merged back in page order
+    return TextNormalizer().normalize(text or "" for text in page_texts), unread_pages
@@ -0,0 +1,108 @@
+import csv
+import os
+from text_encoding import open_text
+from workspace import open_binary
+
+# Output limits for one workbook; rows past a limit are dropped
+spreadsheet_max_rows = int(os.getenv('SPREADSHEET_MAX_ROWS', 200000))
+spreadsheet_max_cells = int(os.getenv('SPREADSHEET_MAX_CELLS', 2000000))
+spreadsheet_max_chars = int(os.getenv('SPREADSHEET_MAX_CHARS', 20 * 1024 * 1024))
+
+
+class SpreadsheetBudget:
+    """Row, cell and character limits shared by every sheet of one spreadsheet."""
+
+    def __init__(self, max_rows=None, max_cells=None, max_chars=None):
+        self.max_rows = spreadsheet_max_rows if max_rows is None else max_rows
+        self.max_cells = spreadsheet_max_cells if max_cells is None else max_cells
+        self.max_chars = spreadsheet_max_chars if max_chars is None else max_chars
+        self.rows = 0
+        self.cells = 0
+        self.chars = 0
+        self.truncated = None
+
+    def take(self, cells, chars):
+        """Counts one output line, or returns why it no longer fits."""
+        if self.rows + 1 > self.max_rows:
+            self.truncated = f'more than {self.max_rows} rows'
+        elif self.cells + cells > self.max_cells:
+            self.truncated = f'more than {self.max_cells} cells'
+        elif self.chars + chars > self.max_chars:
+            self.truncated = f'more than {self.max_chars} characters'
+        if self.truncated is not None:
+            return self.truncated
+        self.rows += 1
+        self.cells += cells
+        self.chars += chars
+        return None
+
+
+def format_cell(value):
+    """Renders a cell compactly: empty for blanks, whole floats without the trailing .0."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value)
+    if '\t' in text or '\n' in text or '\r' in text:
+        # Keeps every row on one line of the tab-separated output
+        text = ' '.join(text.split())
+    return text
+
+
+def iter_lines(rows, budget):
+    """Yields each non-empty row as a tab-separated line until the budget runs out."""
+    for row in rows:
+        cells = [format_cell(value) for value in row]
+        while cells and not cells[-1]:
+            cells.pop()
+        if not cells:
+            continue
+        line = '\t'.join(cells)
+        reason = budget.take(len(cells), len(line) + 1)
+        if reason is not None:
+            yield f'[Truncated: {reason}]'
+            return
+        yield line
+
+
+def iter_xlsx_lines(source, budget=None):
+    """Streams the rows of every worksheet of an XLSX workbook as tab-separated lines.
+
+    The workbook is opened read-only, so rows are parsed as they are read instead of loading the sheets.
+    """
+    import openpyxl
+
+    budget = SpreadsheetBudget() if budget is None else budget
+    with open_binary(source) as stream:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        try:
+            worksheets = workbook.worksheets
+            for worksheet in worksheets:
+                if len(worksheets) > 1:
+                    yield f'Sheet: {worksheet.title}'
+                yield from iter_lines(worksheet.iter_rows(values_only=True), budget)
+                if budget.truncated is not None:
+                    return
+        finally:
+            workbook.close()
+
+
+def iter_csv_lines(source, budget=None):
+    """Streams the rows of a CSV file as tab-separated lines, decoding it incrementally.
+
+    The encoding is detected once from the start of the file, so the file is parsed a single time.
+    """
+    budget = SpreadsheetBudget() if budget is None else budget
+    with open_text(open_binary(source), newline='') as text:
+        yield from iter_lines(csv.reader(text), budget)
+
+
+def xlsx_to_text(source):
+    """Returns the rows of every worksheet as compact tab-separated text."""
+    return '\n'.join(iter_xlsx_lines(source))
+
+
+def csv_to_text(source):
+    """Returns the rows of a CSV file as compact tab-separated text."""
+    return '\n'.join(iter_csv_lines(source))
@@ -0,0 +1,12 @@
+"""Run from the repository root: python -m pytest tests"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Placeholders so that importing the extractors needs no Azure configuration
+for name in ('endpoint', 'AZURE_FORM_RECOGNIZER_ENDPOINT'):
+    os.environ.setdefault(name, 'https://azure.invalid')
+for name in ('subscription_key', 'AZURE_FORM_RECOGNIZER_KEY'):
+    os.environ.setdefault(name, 'test')
+os.environ['EXTRACTION_CACHE_PATH'] = ''
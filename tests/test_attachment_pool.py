@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+import extract_text_wordpdf
+import extraction_cache
+from attachment_pool import extract_attachments
+from extraction_cache import ExtractionCache
+from metrics import collecting_timings, timing_breakdown
+from workspace import Workspace
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = ExtractionCache(disk_path='')
+    monkeypatch.setattr(extraction_cache, '_extraction_cache', cache)
+    return cache
+
+
+def typed_pdf(text):
+    import fitz
+    document = fitz.open()
+    document.new_page().insert_text((72, 72), text)
+    return document.tobytes()
+
+
+def test_pdf_attachments_are_cached_and_timed_in_this_process(monkeypatch, memory_cache):
+    recognizer = mock.Mock()
+    recognizer.begin_analyze_document.return_value.result.return_value = SimpleNamespace(pages=[], tables=[])
+    monkeypatch.setattr(extract_text_wordpdf, 'get_form_recognizer_client', lambda: recognizer)
+
+    with Workspace() as workspace, collecting_timings():
+        data = typed_pdf('Typed policy')
+        attachments = [{'filename': name, 'file': workspace.spool(name, data)} for name in ('a.pdf', 'b.pdf')]
+        first, second = extract_attachments(attachments[:1]) + extract_attachments(attachments[1:])
+        breakdown = timing_breakdown()
+
+    assert 'Typed policy' in first['content']['text']
+    assert second['content'] == first['content']
+    # The second copy is a cache hit, counted by the cache of the request's own process
+    assert memory_cache.stats()['memory_hits'] == 1
+    assert recognizer.begin_analyze_document.call_count == 1
+    assert breakdown['stages']['form_recognizer']['count'] == 1
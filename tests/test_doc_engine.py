@@ -0,0 +1,38 @@
+import time
+
+import doc_engine
+
+
+def hang(data):
+    time.sleep(60)
+
+
+def echo(data):
+    return data.decode('ascii')
+
+
+def test_timeout_restarts_the_pool(monkeypatch):
+    monkeypatch.setattr(doc_engine, 'doc_process_workers', 1)
+    monkeypatch.setattr(doc_engine, 'doc_extract_timeout', 2)
+    monkeypatch.setattr(doc_engine, '_doc_pool', None)
+    monkeypatch.setattr(doc_engine, 'spire_doc_text', hang)
+    pool = doc_engine.get_doc_pool()
+    # Start the worker before timing the document so the Spire warm-up does not count against it
+    pool.submit(echo, b'warm').result()
+    processes = list(pool._processes.values())
+
+    try:
+        doc_engine.spire_doc_text_pooled(b'hung document')
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError('the hung document did not time out')
+
+    for process in processes:
+        process.join(5)
+        assert not process.is_alive()
+    # With a single worker, the next document would wait behind the hung one without a fresh pool
+    monkeypatch.setattr(doc_engine, 'spire_doc_text', echo)
+    assert doc_engine.get_doc_pool() is not pool
+    assert doc_engine.spire_doc_text_pooled(b'next document') == 'next document'
+    doc_engine.get_doc_pool().shutdown()
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+import extract_text_wordpdf
+import extraction_cache
+from extraction_cache import ExtractionCache, is_cacheable
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    """Gives every test an empty, memory-only extraction cache."""
+    cache = ExtractionCache(disk_path='')
+    monkeypatch.setattr(extraction_cache, '_extraction_cache', cache)
+    return cache
+
+
+def empty_analysis():
+    """A Form Recognizer client whose analysis finds no pages or tables."""
+    client = mock.Mock()
+    client.begin_analyze_document.return_value.result.return_value = SimpleNamespace(pages=[], tables=[])
+    return client
+
+
+def read_client(text):
+    """A Computer Vision client whose Read operations succeed with a single line."""
+    from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
+    client = mock.Mock()
+    client.read_in_stream.return_value.headers = {'Operation-Location': 'https://azure.invalid/operations/1'}
+    line = SimpleNamespace(text=text)
+    output = SimpleNamespace(
+        status=OperationStatusCodes.succeeded,
+        analyze_result=SimpleNamespace(read_results=[SimpleNamespace(lines=[line])])
+    )
+    client.get_read_result.return_value = SimpleNamespace(output=output, response=None)
+    return client
+
+
+def test_is_cacheable_rejects_results_with_errors():
+    assert is_cacheable({'text': 'Invoice', 'tables': [], 'checkboxes': []})
+    assert not is_cacheable({'text': 'Invoice', 'tables': [], 'checkboxes': [], 'errors': ['OCR failed']})
+    assert not is_cacheable({'text': '', 'tables': [], 'checkboxes': []})
+    assert not is_cacheable({})
+
+
+def test_failed_ocr_is_not_cached(monkeypatch, memory_cache):
+    vision = mock.Mock()
+    vision.read_in_stream.side_effect = ConnectionError('service unavailable')
+    monkeypatch.setattr(extract_text_wordpdf, 'get_computervision_client', lambda: vision)
+    monkeypatch.setattr(extract_text_wordpdf, 'get_form_recognizer_client', empty_analysis)
+
+    first = extract_text_wordpdf.process_image_data(b'image bytes')
+    assert first['text'] == ''
+    assert first['errors']
+
+    second = extract_text_wordpdf.process_image_data(b'image bytes')
+    assert second['errors']
+    assert vision.read_in_stream.call_count == 2
+    assert memory_cache.stats()['stores'] == 0
+
+
+def test_failed_analysis_is_not_cached(monkeypatch, memory_cache):
+    recognizer = mock.Mock()
+    recognizer.begin_analyze_document.side_effect = ConnectionError('service unavailable')
+    monkeypatch.setattr(extract_text_wordpdf, 'get_computervision_client', lambda: read_client('Invoice'))
+    monkeypatch.setattr(extract_text_wordpdf, 'get_form_recognizer_client', lambda: recognizer)
+
+    first = extract_text_wordpdf.process_image_data(b'image bytes')
+    assert first['text'].strip() == 'Invoice'
+    assert first['errors'] == ['Form Recognizer analysis failed: service unavailable']
+
+    extract_text_wordpdf.process_image_data(b'image bytes')
+    assert recognizer.begin_analyze_document.call_count == 2
+    assert memory_cache.stats()['stores'] == 0
+
+
+def test_complete_result_is_cached(monkeypatch, memory_cache):
+    vision = read_client('Invoice')
+    monkeypatch.setattr(extract_text_wordpdf, 'get_computervision_client', lambda: vision)
+    monkeypatch.setattr(extract_text_wordpdf, 'get_form_recognizer_client', empty_analysis)
+
+    first = extract_text_wordpdf.process_image_data(b'image bytes')
+    second = extract_text_wordpdf.process_image_data(b'image bytes')
+    assert 'errors' not in first
+    assert second == first
+    assert vision.read_in_stream.call_count == 1
+    assert memory_cache.stats()['memory_hits'] == 1
+
+
+def test_pdf_with_unread_pages_is_not_cached(monkeypatch, memory_cache):
+    import fitz
+    document = fitz.open()
+    document.new_page().insert_text((72, 72), 'Typed page')
+    # A page without a text layer goes to OCR
+    document.new_page()
+    pdf_data = document.tobytes()
+    vision = mock.Mock()
+    vision.read_in_stream.side_effect = ConnectionError('service unavailable')
+    monkeypatch.setattr(extract_text_wordpdf, 'get_computervision_client', lambda: vision)
+    monkeypatch.setattr(extract_text_wordpdf, 'get_form_recognizer_client', empty_analysis)
+
+    first = extract_text_wordpdf.process_pdf_upload(pdf_data)
+    assert 'Typed page' in first['text']
+    assert first['errors'] == ['OCR failed on page 2']
+
+    extract_text_wordpdf.process_pdf_upload(pdf_data)
+    assert vision.read_in_stream.call_count == 2
+    assert memory_cache.stats()['stores'] == 0
+
+
+def test_scanned_pages_are_ocrd_in_page_order(monkeypatch, memory_cache):
+    import fitz
+    document = fitz.open()
+    document.new_page()
+    document.new_page().insert_text((72, 72), 'Typed page')
+    pdf_data = document.tobytes()
+    vision = read_client('Scanned page')
+    monkeypatch.setattr(extract_text_wordpdf, 'get_computervision_client', lambda: vision)
+    monkeypatch.setattr(extract_text_wordpdf, 'get_form_recognizer_client', empty_analysis)
+
+    result = extract_text_wordpdf.process_pdf_upload(pdf_data)
+    assert 'errors' not in result
+    assert result['text'].index('Scanned page') < result['text'].index('Typed page')
+    assert memory_cache.stats()['stores'] == 1
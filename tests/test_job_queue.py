@@ -0,0 +1,83 @@
+import io
+import time
+
+from job_queue import FAILED, QUEUED, RUNNING, JobQueue
+
+
+def enqueue(queue, filename='invoice.pdf'):
+    return queue.enqueue(filename, io.BytesIO(b'payload'))
+
+
+def test_failed_attempt_is_retried_after_the_delay(tmp_path):
+    queue = JobQueue(str(tmp_path), max_attempts=3, retry_delay=60)
+    job_id = enqueue(queue)
+    job = queue.claim()
+    assert queue.fail(job, 'Form Recognizer analysis failed')
+
+    stored = queue.get(job_id)
+    assert stored['status'] == QUEUED
+    assert stored['error'] == 'Form Recognizer analysis failed'
+    # The backoff keeps the job from being claimed straight away
+    assert queue.claim() is None
+
+
+def test_retried_job_is_claimed_again(tmp_path):
+    queue = JobQueue(str(tmp_path), max_attempts=3, retry_delay=0)
+    job_id = enqueue(queue)
+    queue.fail(queue.claim(), 'OCR failed')
+
+    job = queue.claim()
+    assert job.id == job_id
+    assert job.attempts == 2
+
+
+def test_last_failed_attempt_fails_the_job(tmp_path):
+    queue = JobQueue(str(tmp_path), max_attempts=2, retry_delay=0)
+    job_id = enqueue(queue)
+    queue.fail(queue.claim(), 'first')
+    queue.fail(queue.claim(), 'second')
+
+    stored = queue.get(job_id)
+    assert stored['status'] == FAILED
+    assert stored['error'] == 'second'
+    assert queue.claim() is None
+
+
+def test_expired_lease_hands_the_job_to_the_next_worker(tmp_path):
+    queue = JobQueue(str(tmp_path), visibility_timeout=0.05, max_attempts=3)
+    job_id = enqueue(queue)
+    first = queue.claim()
+    assert queue.claim() is None
+    time.sleep(0.1)
+
+    second = queue.claim()
+    assert second.id == job_id
+    assert second.attempts == 2
+    # The worker that lost its lease can no longer record a result
+    assert not queue.extend_lease(first)
+    assert not queue.complete(first, {'result': 'stale'})
+    assert queue.complete(second, {'result': 'fresh'})
+    assert queue.get(job_id)['result'] == {'result': 'fresh'}
+
+
+def test_extended_lease_keeps_the_job(tmp_path):
+    queue = JobQueue(str(tmp_path), visibility_timeout=0.2, max_attempts=3)
+    job_id = enqueue(queue)
+    job = queue.claim()
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.extend_lease(job)
+        assert queue.claim() is None
+    assert queue.get(job_id)['status'] == RUNNING
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(tmp_path):
+    queue = JobQueue(str(tmp_path), visibility_timeout=0.05, max_attempts=1)
+    job_id = enqueue(queue)
+    queue.claim()
+    time.sleep(0.1)
+
+    assert queue.claim() is None
+    stored = queue.get(job_id)
+    assert stored['status'] == FAILED
+    assert stored['error'] == 'Job lease expired on the final attempt'
@@ -0,0 +1,51 @@
+import io
+
+import app
+import job_worker
+from job_queue import FAILED, QUEUED, SUCCEEDED, JobQueue
+
+
+def run_one(monkeypatch, tmp_path, filename, result):
+    """Queues one upload, runs it with process_upload returning result, and returns the stored job."""
+    monkeypatch.setattr(app, 'process_upload', lambda *args, **kwargs: result)
+    queue = JobQueue(str(tmp_path), max_attempts=3)
+    job_id = queue.enqueue(filename, io.BytesIO(b'payload'))
+    job_worker.run_job(queue, queue.claim())
+    return queue.get(job_id)
+
+
+def test_error_payload_fails_the_job(monkeypatch, tmp_path):
+    job = run_one(monkeypatch, tmp_path, 'notes.bin', {'error': 'Unsupported file type'})
+    assert job['status'] == FAILED
+    assert job['error'] == 'Unsupported file type'
+    assert 'result' not in job
+
+
+def test_result_payload_completes_the_job(monkeypatch, tmp_path):
+    job = run_one(monkeypatch, tmp_path, 'invoice.pdf', {'result': {'text': 'Invoice'}})
+    assert job['status'] == SUCCEEDED
+    assert job['result'] == {'result': {'text': 'Invoice'}}
+
+
+def test_incomplete_result_is_retried(monkeypatch, tmp_path):
+    incomplete = {'result': {'Attachments': [{'content': {'text': 'Invoice', 'errors': ['OCR failed on page 2']}}]}}
+    job = run_one(monkeypatch, tmp_path, 'invoice.eml', incomplete)
+    assert job['status'] == QUEUED
+    assert job['error'] == 'OCR failed on page 2'
+
+
+def test_empty_result_is_retried(monkeypatch, tmp_path):
+    job = run_one(monkeypatch, tmp_path, 'invoice.pdf', {'result': {}})
+    assert job['status'] == QUEUED
+    assert job['error'] == 'The extraction returned no content'
+
+
+def test_last_attempt_keeps_an_incomplete_result(monkeypatch, tmp_path):
+    incomplete = {'result': {'text': 'Invoice', 'errors': ['OCR failed on page 2']}}
+    monkeypatch.setattr(app, 'process_upload', lambda *args, **kwargs: incomplete)
+    queue = JobQueue(str(tmp_path), max_attempts=1)
+    job_id = queue.enqueue('invoice.pdf', io.BytesIO(b'payload'))
+    job_worker.run_job(queue, queue.claim())
+    job = queue.get(job_id)
+    assert job['status'] == SUCCEEDED
+    assert job['result'] == incomplete
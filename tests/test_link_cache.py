@@ -0,0 +1,19 @@
+import os
+from types import SimpleNamespace
+
+from link_cache import LinkCache
+
+
+def response(url):
+    return SimpleNamespace(url=url, status=200, headers={'Cache-Control': 'max-age=3600', 'ETag': '"v1"'})
+
+
+def test_entries_of_another_extractor_version_are_misses(tmp_path):
+    path = os.path.join(str(tmp_path), 'links.sqlite3')
+    url = 'https://Example.com:443/policy.pdf#page=2'
+    LinkCache(path, extractor_version='1').put(response(url), 'Policy text')
+
+    assert LinkCache(path, extractor_version='1').get('https://example.com/policy.pdf').content == 'Policy text'
+    upgraded = LinkCache(path, extractor_version='2')
+    assert upgraded.get(url) is None
+    assert upgraded.stats()['misses'] == 1
@@ -0,0 +1,89 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from link_fetcher import LinkFetcher
+
+PAGES = {
+    '/notes.txt': ('text/plain', b'plain text line\n' * 1000),
+    '/report.pdf': ('application/pdf', b'%PDF-1.7\n' + b'0' * 4000),
+    '/mislabelled': ('text/html', b'%PDF-1.4\nnot really html'),
+    '/page': ('application/octet-stream', b'<!DOCTYPE html><html><body>Policy</body></html>'),
+    '/rates.csv': ('text/plain', b'plan,rate\nbasic,10\n'),
+}
+
+
+@pytest.fixture
+def server():
+    """Serves PAGES on a local port, counting requests per path and the peak number in flight."""
+    state = {'requests': {}, 'in_flight': 0, 'peak': 0, 'delay': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                state['requests'][self.path] = state['requests'].get(self.path, 0) + 1
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            try:
+                time.sleep(state['delay'])
+                content_type, body = PAGES.get(self.path, ('text/plain', b'slow page'))
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    state['in_flight'] -= 1
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state['url'] = f'http://127.0.0.1:{httpd.server_port}'
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_text_is_truncated_at_the_byte_limit(server):
+    link = LinkFetcher(max_bytes=1000).fetch(server['url'] + '/notes.txt')
+    assert link.ok
+    assert link.truncated
+    assert len(link.content) == 1000
+    assert link.kind == 'txt'
+
+
+def test_truncated_binary_document_is_skipped(server):
+    link = LinkFetcher(max_bytes=1000).fetch(server['url'] + '/report.pdf')
+    assert link.truncated
+    assert link.kind is None
+
+
+def test_kind_is_sniffed_from_the_content(server):
+    fetcher = LinkFetcher()
+    assert fetcher.fetch(server['url'] + '/report.pdf').kind == 'pdf'
+    # The bytes win over a wrong or generic Content-Type
+    assert fetcher.fetch(server['url'] + '/mislabelled').kind == 'pdf'
+    assert fetcher.fetch(server['url'] + '/page').kind == 'html'
+    # Text has no signature, so the extension decides
+    assert fetcher.fetch(server['url'] + '/rates.csv').kind == 'csv'
+
+
+def test_repeated_urls_are_fetched_once(server):
+    urls = [server['url'] + '/notes.txt', server['url'] + '/page', server['url'] + '/notes.txt']
+    links = LinkFetcher().fetch_many(urls)
+    assert [link.url for link in links] == urls[:2]
+    assert server['requests'] == {'/notes.txt': 1, '/page': 1}
+
+
+def test_requests_per_host_are_limited(server):
+    server['delay'] = 0.2
+    urls = [f"{server['url']}/slow/{number}" for number in range(6)]
+    links = LinkFetcher(max_workers=6, per_host=2).fetch_many(urls)
+    assert all(link.ok for link in links)
+    assert server['peak'] == 2
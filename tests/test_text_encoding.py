@@ -0,0 +1,56 @@
+import codecs
+
+from email_message import ParsedEmail
+from text_encoding import decode_bytes, detect_encoding
+
+JAPANESE = 'お見積もりの件、承知しました。'
+
+
+def test_byte_order_mark_wins_over_declared_charset():
+    assert detect_encoding(codecs.BOM_UTF8 + 'café'.encode('utf-8'), 'latin-1') == 'utf-8-sig'
+
+
+def test_declared_7bit_charset_wins_over_utf8():
+    data = JAPANESE.encode('iso-2022-jp')
+    # ISO-2022-JP only uses 7-bit bytes, so it is also valid UTF-8
+    assert data.decode('utf-8')
+    assert detect_encoding(data, 'iso-2022-jp', complete=True) == 'iso2022_jp'
+    assert decode_bytes(data, 'ISO-2022-JP') == JAPANESE
+
+
+def test_utf8_wins_over_a_single_byte_label():
+    data = 'Grüße café'.encode('utf-8')
+    assert detect_encoding(data, 'iso-8859-1', complete=True) == 'utf-8'
+    assert decode_bytes(data, 'iso-8859-1') == 'Grüße café'
+    assert decode_bytes(data, 'windows-1252') == 'Grüße café'
+
+
+def test_single_byte_label_is_kept_when_the_bytes_are_not_utf8():
+    assert decode_bytes('Grüße café'.encode('iso-8859-1'), 'iso-8859-1') == 'Grüße café'
+
+
+def test_declared_charset_that_does_not_decode_falls_back_to_utf8():
+    assert detect_encoding('café'.encode('utf-8'), 'us-ascii', complete=True) == 'utf-8'
+
+
+def text_email(charset, body):
+    """Builds a single-part text/plain email whose body bytes are sent as they are."""
+    return (
+        b'From: a@example.com\r\n'
+        b'To: b@example.com\r\n'
+        b'Subject: quote\r\n'
+        b'MIME-Version: 1.0\r\n'
+        b'Content-Type: text/plain; charset="' + charset.encode('ascii') + b'"\r\n'
+        b'Content-Transfer-Encoding: 8bit\r\n'
+        b'\r\n' + body + b'\r\n'
+    )
+
+
+def test_iso_2022_jp_text_part():
+    eml = text_email('ISO-2022-JP', JAPANESE.encode('iso-2022-jp'))
+    assert ParsedEmail.from_bytes(eml).text_parts == [('text/plain', JAPANESE + '\r\n')]
+
+
+def test_utf8_text_part_labelled_iso_8859_1():
+    eml = text_email('ISO-8859-1', 'Grüße café'.encode('utf-8'))
+    assert ParsedEmail.from_bytes(eml).text_parts == [('text/plain', 'Grüße café\r\n')]
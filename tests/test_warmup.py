@@ -0,0 +1,18 @@
+import pytest
+
+import azure_clients
+import warmup
+
+
+def test_client_errors_are_reported_and_raised_on_first_use(monkeypatch, capsys):
+    monkeypatch.delenv('subscription_key')
+    monkeypatch.setattr(azure_clients, '_clients', {})
+
+    timings = warmup.warm_up(modules=('json',))
+    assert 'computervision' not in timings
+    assert 'form_recognizer' in timings
+    assert 'Warm-up could not create the computervision client' in capsys.readouterr().out
+
+    # Nothing was cached, so the first OCR call raises the configuration error
+    with pytest.raises(ValueError):
+        azure_clients.get_computervision_client()
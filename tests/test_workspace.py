@@ -0,0 +1,18 @@
+from workspace import Workspace, open_binary
+
+
+def test_open_binary_keeps_a_small_spool_in_memory():
+    with Workspace(max_memory=1024) as workspace:
+        spooled = workspace.spool('small.docx', b'PK small document')
+        with open_binary(spooled) as stream:
+            assert stream.read() == b'PK small document'
+        assert spooled.in_memory
+        assert spooled.path is None
+
+
+def test_open_binary_reads_a_spilled_spool_from_disk():
+    with Workspace(max_memory=4) as workspace:
+        spooled = workspace.spool('large.docx', b'PK large document')
+        assert not spooled.in_memory
+        with open_binary(spooled) as stream:
+            assert stream.read() == b'PK large document'
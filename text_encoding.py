@@ -0,0 +1,114 @@
+import codecs
+import io
+import os
+import re
+
+# Only this much of a file is inspected to choose its encoding; the rest is decoded without checks
+encoding_sniff_bytes = int(os.getenv('ENCODING_SNIFF_BYTES', 64 * 1024))
+
+# UTF-32 LE must be tried before UTF-16 LE, whose mark it starts with
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Text that nothing recognises is still readable as Latin-1, which maps every byte
+FALLBACK_ENCODING = 'latin-1'
+
+# Unicode blocks charset-normalizer reports that say nothing about the script of the text
+SCRIPT_NEUTRAL_BLOCKS = {
+    'General Punctuation', 'Control character', 'Currency Symbols', 'Letterlike Symbols',
+    'Number Forms', 'Spacing Modifier Letters', 'Mathematical Operators',
+}
+
+HTML_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+
+def codec_name(encoding):
+    """Returns the canonical name of a codec, or None when Python does not know it."""
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding.strip()).name
+    except LookupError:
+        return None
+
+
+def decodes(prefix, encoding, complete):
+    """Tells whether prefix decodes strictly; a prefix may end inside a multi-byte character."""
+    try:
+        codecs.getincrementaldecoder(encoding)(errors='strict').decode(prefix, final=complete)
+        return True
+    except UnicodeError:
+        return False
+
+
+def detect_encoding(prefix, declared=None, complete=False):
+    """Chooses the encoding of text from its first bytes.
+
+    A byte order mark wins, then UTF-8 when the bytes hold non-ASCII text that is valid UTF-8, then
+    a declared charset that actually decodes the bytes, then charset-normalizer's best guess.
+    complete says whether prefix is the whole text.
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    # NUL bytes are valid UTF-8 but mean UTF-16 or UTF-32 without a byte order mark
+    utf8 = b'\x00' not in prefix and decodes(prefix, 'utf-8', complete)
+    # Single-byte charsets such as ISO-8859-1 decode any bytes, so a UTF-8 body mislabelled with one
+    # is caught here. 7-bit and stateful charsets such as ISO-2022-JP are plain ASCII to UTF-8 and
+    # fall through to their declaration.
+    if utf8 and not prefix.isascii():
+        return 'utf-8'
+    declared = codec_name(declared)
+    if declared is not None and decodes(prefix, declared, complete):
+        return declared
+    if utf8:
+        return 'utf-8'
+
+    from charset_normalizer import from_bytes
+    matches = from_bytes(prefix)
+    best = matches.best()
+    if best is None or codec_name(best.encoding) is None:
+        return FALLBACK_ENCODING
+    # Short Western European samples are often scored as another Latin code page, or tie with
+    # unrelated ones; Windows-1252 is what Western mail and office files use, so it wins whenever
+    # the text reads as Latin script or the scores cannot tell the candidates apart
+    latin = all('Latin' in alphabet or alphabet in SCRIPT_NEUTRAL_BLOCKS for alphabet in best.alphabets)
+    tied = {codec_name(match.encoding) for match in matches
+            if (match.percent_chaos, match.percent_coherence) == (best.percent_chaos, best.percent_coherence)}
+    if (latin or 'cp1252' in tied) and decodes(prefix, 'cp1252', complete):
+        return 'cp1252'
+    return codec_name(best.encoding)
+
+
+def decode_bytes(data, declared=None):
+    """Decodes bytes in a single pass with the encoding detected from their start."""
+    data = bytes(data)
+    prefix = data[:encoding_sniff_bytes]
+    encoding = detect_encoding(prefix, declared, complete=len(prefix) == len(data))
+    return data.decode(encoding, errors='replace')
+
+
+def html_charset(prefix):
+    """Returns the charset an HTML document declares in a meta tag near its start, if any."""
+    match = HTML_CHARSET.search(prefix)
+    return match.group(1).decode('ascii') if match else None
+
+
+def decode_html(data):
+    """Decodes an HTML document, honouring its meta charset when the bytes agree with it."""
+    data = bytes(data)
+    return decode_bytes(data, html_charset(data[:encoding_sniff_bytes]))
+
+
+def open_text(stream, declared=None, newline=None):
+    """Wraps a seekable binary stream in a text stream, choosing the encoding from its start."""
+    prefix = stream.read(encoding_sniff_bytes)
+    complete = not stream.read(1)
+    stream.seek(0)
+    encoding = detect_encoding(prefix, declared, complete)
+    return io.TextIOWrapper(stream, encoding=encoding, errors='replace', newline=newline)
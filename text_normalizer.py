@@ -0,0 +1,88 @@
+import re
+
+# Used only to find the leading whitespace run of a chunk
+WHITESPACE = re.compile(r'\s+')
+# A run of whitespace holding at least one blank line separates paragraphs; anchoring on the first
+# line break keeps long runs of spaces from being rescanned at every position
+PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n\s*')
+
+
+def collapse(text):
+    # str.split drops every whitespace run, the ends included, in a single C-level pass; this
+    # is several times faster than a regex substitution followed by strip
+    return ' '.join(text.split())
+
+
+def normalize_text(text, keep_paragraphs=False):
+    """Collapses every whitespace run to a single space and strips the ends, in one pass over the text.
+
+    With keep_paragraphs, runs holding a blank line become a single blank line instead.
+    """
+    if keep_paragraphs:
+        paragraphs = (collapse(paragraph) for paragraph in PARAGRAPH_BREAK.split(text))
+        return '\n\n'.join(paragraph for paragraph in paragraphs if paragraph)
+    return collapse(text)
+
+
+def normalize_result(value, keep_paragraphs=False):
+    """Normalizes every string in an extractor result, leaving other values such as dates untouched."""
+    if isinstance(value, str):
+        return normalize_text(value, keep_paragraphs)
+    if isinstance(value, dict):
+        return {key: normalize_result(item, keep_paragraphs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize_result(item, keep_paragraphs) for item in value]
+    return value
+
+
+class TextNormalizer:
+    """Normalizes text fed in chunks, such as page by page, with the same result as normalize_text on the whole.
+
+    Trailing whitespace of a chunk is held back until the next chunk shows whether the run continues,
+    so runs split across chunks still collapse to one separator.
+    """
+
+    def __init__(self, keep_paragraphs=False):
+        self.keep_paragraphs = keep_paragraphs
+        self.pending = ''
+        self.started = False
+
+    def separator(self, whitespace):
+        if self.keep_paragraphs and PARAGRAPH_BREAK.search(whitespace):
+            return '\n\n'
+        return ' '
+
+    def shorten(self, whitespace):
+        # Only the line breaks of a held-back run can matter, so long runs are kept short
+        if len(whitespace) <= 2:
+            return whitespace
+        return '\n' * min(whitespace.count('\n'), 2) or ' '
+
+    def feed(self, chunk):
+        """Returns the normalized text of chunk that is final so far."""
+        if not chunk:
+            return ''
+        text = self.pending + chunk
+        body = text.rstrip()
+        self.pending = self.shorten(text[len(body):])
+        if not body:
+            return ''
+        normalized = normalize_text(body, self.keep_paragraphs)
+        if not self.started:
+            self.started = bool(normalized)
+            return normalized
+        if normalized and body[0].isspace():
+            return self.separator(WHITESPACE.match(body).group()) + normalized
+        return normalized
+
+    def close(self):
+        """Ends the text; trailing whitespace is dropped like the end of a stripped string."""
+        self.pending = ''
+        self.started = False
+        return ''
+
+    def normalize(self, chunks):
+        """Returns the normalized concatenation of an iterable of chunks."""
+        parts = [self.feed(chunk) for chunk in chunks]
+        parts.append(self.close())
+        return ''.join(parts)
@@ -0,0 +1,49 @@
+import importlib
+import os
+import time
+from azure_clients import get_computervision_client, get_form_recognizer_client
+
+# Set to warm every extractor when the API process starts instead of on its first request
+warm_up_on_start = os.getenv('WARM_UP_ON_START', '').lower() in ('1', 'true', 'yes')
+
+# Dependencies the extractors import on first use, in rough order of import cost
+EXTRACTOR_MODULES = (
+    'spire.doc',
+    'openpyxl',
+    'charset_normalizer',
+    'extract_msg',
+    'azure.cognitiveservices.vision.computervision.models',
+    'azure.ai.formrecognizer',
+    'fitz',
+    'numpy',
+    'lxml.etree',
+)
+
+
+def warm_up(modules=EXTRACTOR_MODULES, clients=True):
+    """Imports the extractor dependencies and creates the Azure clients ahead of the first request.
+
+    Returns the seconds spent on each step; a dependency that fails to import or a client that cannot
+    be created is reported and skipped, so the first request that needs it raises the error instead.
+    """
+    timings = {}
+    for module in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"Warm-up could not import {module}: {e}")
+            continue
+        timings[module] = time.perf_counter() - started
+    if clients:
+        for name, get_client in (('computervision', get_computervision_client),
+                                 ('form_recognizer', get_form_recognizer_client)):
+            started = time.perf_counter()
+            try:
+                get_client()
+            except Exception as e:
+                print(f"Warm-up could not create the {name} client: {e}")
+                continue
+            timings[name] = time.perf_counter() - started
+    print(f"Warm-up finished in {sum(timings.values()):.2f}s")
+    return timings
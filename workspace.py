@@ -0,0 +1,200 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from io import BytesIO
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+# Files up to this size stay in memory, larger ones spill into the request's private directory
+spool_max_memory = int(os.getenv('SPOOL_MAX_MEMORY', 8 * 1024 * 1024))
+
+
+class FileTooLarge(RequestEntityTooLarge):
+    """Raised while spooling a file that grows past its size limit."""
+
+
+class SpooledFile:
+    """A file kept in memory below a size threshold and spilled to the workspace directory above it.
+
+    Content is hashed as it is written, and the file can be read back like a regular stream.
+    """
+
+    def __init__(self, workspace, name, max_memory=None, max_size=None):
+        self.workspace = workspace
+        self.name = name
+        self.max_memory = spool_max_memory if max_memory is None else max_memory
+        self.max_size = max_size
+        self.size = 0
+        self.path = None
+        self._buffer = BytesIO()
+        self._file = None
+        self._hash = hashlib.sha256()
+        self._position = 0
+
+    @property
+    def in_memory(self):
+        return self._file is None
+
+    @property
+    def sha256(self):
+        """Hex SHA-256 of everything written so far."""
+        return self._hash.hexdigest()
+
+    def _stream(self):
+        return self._buffer if self.in_memory else self._file
+
+    def write(self, data):
+        """Appends data, moving the file to disk once it crosses the threshold."""
+        if self.max_size is not None and self.size + len(data) > self.max_size:
+            raise FileTooLarge(f"{self.name} exceeds the {self.max_size} byte limit")
+        if self.in_memory and self.size + len(data) > self.max_memory:
+            self.rollover()
+        stream = self._stream()
+        stream.seek(0, os.SEEK_END)
+        stream.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """Moves the read position; writes always append."""
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def read(self, size=-1):
+        stream = self._stream()
+        stream.seek(self._position)
+        data = stream.read(size)
+        self._position += len(data)
+        return data
+
+    def readline(self, size=-1):
+        stream = self._stream()
+        stream.seek(self._position)
+        data = stream.readline(size)
+        self._position += len(data)
+        return data
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def rollover(self):
+        """Moves the in-memory content into a file inside the workspace directory."""
+        if not self.in_memory:
+            return
+        self.path = self.workspace.new_path(self.name)
+        self._file = open(self.path, 'w+b')
+        self._file.write(self._buffer.getvalue())
+        self._buffer = None
+
+    def to_path(self):
+        """Returns a filesystem path for extractors that only accept paths."""
+        self.rollover()
+        self._file.flush()
+        return self.path
+
+    def source(self):
+        """Returns the bytes while in memory, or the path once spilled to disk."""
+        if self.in_memory:
+            return self._buffer.getvalue()
+        return self.to_path()
+
+    def getvalue(self):
+        """Returns the whole content as bytes."""
+        if self.in_memory:
+            return self._buffer.getvalue()
+        self._file.flush()
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._buffer = None
+
+
+class Workspace:
+    """Private scratch area for a single request, removed again on exit."""
+
+    def __init__(self, max_memory=None):
+        self.max_memory = max_memory
+        self._directory = None
+        self._files = []
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        """Creates the private temp directory the first time something spills to disk."""
+        with self._lock:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix='eml-parsing-')
+            return self._directory
+
+    def new_path(self, name):
+        """Returns a unique path for name, keeping its extension for extension-sensitive tools."""
+        directory = self.directory
+        with self._lock:
+            self._counter += 1
+            safe_name = secure_filename(name) or 'file'
+            return os.path.join(directory, f'{self._counter:03d}_{safe_name}')
+
+    def spool(self, name, data=None, max_size=None):
+        """Creates a spooled file in this workspace, optionally filled with data."""
+        spooled_file = SpooledFile(self, name, self.max_memory, max_size)
+        if data:
+            spooled_file.write(data)
+        with self._lock:
+            self._files.append(spooled_file)
+        return spooled_file
+
+    def cleanup(self):
+        """Closes every spooled file and removes the private directory."""
+        with self._lock:
+            files, self._files = self._files, []
+            directory, self._directory = self._directory, None
+        for spooled_file in files:
+            spooled_file.close()
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
+        return False
+
+
+def source_path(source):
+    """Returns a filesystem path for a path or a spooled file."""
+    if isinstance(source, SpooledFile):
+        return source.to_path()
+    return source
+
+
+def open_binary(source):
+    """Opens bytes, a spooled file or a path as a binary stream, without reading it all into memory."""
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    if isinstance(source, SpooledFile):
+        if source.in_memory:
+            # BytesIO shares the bytes of getvalue() until written to, so a small spool is neither copied nor spilled
+            return BytesIO(source.getvalue())
+        return open(source.to_path(), 'rb')
+    return open(source, 'rb')